@@ -1,2 +1,46 @@
-from .action import Action, add_action
-from .logging import add_log_arguments, init_logging, create_syslog_handler
+from .action import Action, add_action, gather_actions
+from .commands import CommandSpec
+from .fan_out import FanOutError
+
+# The lazy attributes are resolved by ``__getattr__``, pylint can not see them.
+# pylint: disable=undefined-all-variable
+__all__ = [
+    "Action",
+    "CommandSpec",
+    "FanOutError",
+    "add_action",
+    "gather_actions",
+    "CachePolicy",
+    "add_log_arguments",
+    "init_logging",
+    "create_syslog_handler",
+]
+# pylint: enable=undefined-all-variable
+
+_LAZY_ATTRIBUTES = {
+    "CachePolicy": ".cache",
+    "add_log_arguments": ".logging",
+    "init_logging": ".logging",
+    "create_syslog_handler": ".logging",
+}
+
+
+def __getattr__(name):
+    """
+    Import the logging helpers and ``CachePolicy`` only when they are used,
+    because importing ``logging.handlers`` costs more than the rest of
+    ``argparse_action``.
+    """
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib  # pylint: disable=import-outside-toplevel
+
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
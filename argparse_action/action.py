@@ -1,12 +1,15 @@
 import collections.abc
 import argparse
-import inspect
+import contextvars
 import itertools
-import typing
+import operator
 import types
 import enum
 import sys
 
+from .commands import CommandSpec, _add_timings_argument, _CommandParsers, _Timings
+from .records import get_record_fields
+
 
 class Action:
     """
@@ -21,33 +24,293 @@ class Action:
     'one_two'
     """
 
-    def __init__(self, parser: argparse.ArgumentParser):
-        self._parsers = parser.add_subparsers(dest="command", metavar="command")
+    def __init__(
+        self,
+        parser: argparse.ArgumentParser,
+        profile=False,
+        timings=False,
+        help_cache=None,
+        xargs=False,
+    ):
+        """
+        Add the command subparsers to ``parser``. With ``profile`` the
+        ``--profile`` options of ``argparse_action.profiling`` are added to
+        ``parser`` and the action of the selected command is run under the
+        profiler when ``--profile`` is given.
+
+        With ``timings`` the ``parse``, ``bind`` and ``call`` phases of every
+        invocation are measured (see ``Action.timings``) and the ``--timings``
+        option of ``parser`` reports them to stderr or as a log record.
+
+        With a ``CachePolicy`` in ``help_cache`` the rendered help of ``parser``
+        and of the command parsers is cached on disk, keyed by a hash of their
+        arguments and the terminal width.
+
+        With ``xargs`` the ``--args-from``, ``--jobs`` and ``--unordered``
+        options of ``argparse_action.xargs`` are added to ``parser`` to run the
+        selected command once per argument line in a process pool.
+        """
+        self._parser = parser
+        self._timings = _Timings()
+        self._parsers = parser.add_subparsers(
+            dest="command", metavar="command", action=_CommandParsers
+        )
         self._parsers.required = True
+        self._parsers.timings = self._timings
+
+        if timings:
+            _add_timings_argument(parser, self._timings)
+            self._parsers.features.add("timings")
+
+        if profile:
+            # pylint: disable-next=import-outside-toplevel
+            from .profiling import add_profile_arguments
+
+            add_profile_arguments(parser)
+            self._parsers.features.add("profile")
+
+        if xargs:
+            # pylint: disable-next=import-outside-toplevel
+            from .xargs import add_xargs_arguments
+
+            add_xargs_arguments(parser)
+            self._parsers.features.add("xargs")
+
+        if help_cache is not None:
+            # pylint: disable-next=import-outside-toplevel
+            from .cache import cache_help
+
+            cache_help(parser, help_cache)
+            self._parsers.help_cache = help_cache
 
     def add(self, *aliases, **arg_options):
         """
         Register the decoreated function into command subparsers with the name
-        of the function. The arguments and options are set by ``add_action``.
+        of the function. The arguments and options are set by ``add_action``
+        when the parser of the command is built from its ``CommandSpec``, but
+        the definition errors of the options are raised at registration.
 
         Arbitrary number of aliases can be specified via ``*aliases`` parameter.
         """
 
         def wrapper(func):
-            parser = self._add_parser(func, aliases)
-            add_action(parser, func, **arg_options)
+            _check_definition(func, arg_options)
+
+            spec = CommandSpec(
+                _conv_to_cli_name(func.__name__),
+                aliases,
+                func,
+                None,
+                func.__doc__,
+                arg_options,
+            )
+            self._timings.measure("register", self._parsers.add_command, spec)
 
             return func
 
         return wrapper
 
-    def _add_parser(self, func, aliases):
-        return self._parsers.add_parser(
-            name=_conv_to_cli_name(func.__name__), help=func.__doc__, aliases=aliases
+    @property
+    def commands(self):
+        """
+        The ``CommandSpec`` registry of the commands by name. The parser of a
+        command is built from its spec only when the command is selected, its
+        help is shown or ``build_parsers`` is called.
+        """
+        return self._parsers.get_specs()
+
+    def build_parsers(self):
+        """
+        Build the parser of every registered command, e.g. before a server
+        forks its workers.
+        """
+        self._parsers.load_all()
+
+    @property
+    def timings(self):
+        """
+        Monotonic seconds spent in the phases of the cli:
+
+        - ``import``: importing the functions of ``add_lazy`` commands
+        - ``register``: building the subparsers and their arguments
+        - ``parse``: ``parse_args`` of the last invocation, lazily registered
+          commands are loaded while parsing
+        - ``bind``: converting the parsed namespace to the function arguments
+        - ``call``: running the function
+
+        The ``import`` and ``register`` phases are accumulated over the life of
+        the ``Action``. The ``parse``, ``bind`` and ``call`` phases are measured
+        only if the ``Action`` was created with ``timings``.
+        """
+        return dict(self._timings)
+
+    # pylint: disable-next=redefined-builtin
+    def add_lazy(self, reference, *aliases, help=None, **arg_options):
+        """
+        Register the function referred by ``reference`` into command subparsers
+        without importing it. The ``reference`` has ``"package.module:function"``
+        format and the name of the command is created from the function name.
+
+        The module is imported and the arguments of the command are built by
+        ``add_action`` only when the command is selected from the cli, so the
+        startup cost does not depend on the number of registered commands.
+        The ``help`` text is listed in the usage help of the commands.
+
+        >>> import argparse
+        >>> parser = argparse.ArgumentParser()
+        >>> action = Action(parser)
+        >>> action.add_lazy("os.path:basename", help="strip the directory")
+        >>> namespace = parser.parse_args("basename /usr/lib".split())
+        >>> namespace.action(namespace)
+        'lib'
+        """
+        module_name, separator, qualname = reference.partition(":")
+        if not module_name or not separator or not qualname:
+            raise ValueError(
+                f"Invalid reference {reference!r}, 'package.module:function' expected"
+            )
+
+        spec = CommandSpec(
+            _conv_to_cli_name(qualname.rpartition(".")[2]),
+            aliases,
+            None,
+            reference,
+            help,
+            arg_options,
         )
+        self._timings.measure("register", self._parsers.add_command, spec)
+
+    def run(self, argv=None):
+        """
+        Parse ``argv`` (``sys.argv[1:]`` by default) and call the action of the
+        selected command. The exit status is returned instead of exiting: cli
+        errors and commands exiting by ``SystemExit`` are reported by its code,
+        the result of the command is ignored and means success.
+
+        >>> import argparse
+        >>> action = Action(argparse.ArgumentParser())
+        >>> @action.add()
+        ... def fail(status: int):
+        ...     raise SystemExit(status)
+        >>> action.run(["fail", "3"])
+        3
+        """
+        try:
+            namespace = self._parser.parse_args(argv)
+            namespace.action(namespace)
+        except SystemExit as error:
+            return _get_exit_status(error.code)
+
+        return 0
+
+    def run_chain(self, argv=None, separator="::"):
+        """
+        Run the commands of ``argv`` (``sys.argv[1:]`` by default) separated by
+        the ``separator`` token in one process. Every command line is parsed
+        before the first command is run.
+
+        The result of a command is handed off to the ``Iterator[T]`` parameter
+        of the next command which reads stdin (``-``), so a generator of a
+        command is consumed lazily by the next one. An iterator result of the
+        last command is exhausted. The exit status is returned like ``run``.
+        """
+        argv = sys.argv[1:] if argv is None else argv
+        command_lines = [
+            list(arguments)
+            for is_separator, arguments in itertools.groupby(
+                argv, lambda argument: argument == separator
+            )
+            if not is_separator
+        ]
+        result = None
+
+        try:
+            namespaces = [
+                self._parser.parse_args(command_line)
+                for command_line in command_lines or [[]]
+            ]
+
+            for namespace in namespaces:
+                token = _PIPE.set(_get_pipe(result))
+
+                try:
+                    result = namespace.action(namespace)
+                finally:
+                    _PIPE.reset(token)
+
+            if isinstance(result, collections.abc.Iterator):
+                for _ in result:
+                    pass
+        except SystemExit as error:
+            return _get_exit_status(error.code)
+
+        return 0
+
+    def run_batch(self, lines):
+        """
+        Run each line of ``lines`` (e.g. an open file or ``sys.stdin``) as a
+        command line with the already built parser. The lines are split by
+        shell quoting rules, empty lines and ``#`` comments are skipped.
+
+        A bad line does not stop the batch: its quoting or cli error (status
+        2) or the traceback of its exception is printed to stderr and the
+        batch goes on. The ``(line_number, exit_status)`` pairs of the executed
+        lines are returned.
+        """
+        import shlex  # pylint: disable=import-outside-toplevel
+        import traceback  # pylint: disable=import-outside-toplevel
+
+        statuses = []
+
+        for line_number, line in enumerate(lines, start=1):
+            try:
+                argv = shlex.split(line, comments=True)
+            except ValueError as error:
+                print(f"line {line_number}: {error}", file=sys.stderr)
+                statuses.append((line_number, 2))
+                continue
+
+            if not argv:
+                continue
+
+            try:
+                status = self.run(argv)
+            except Exception:  # pylint: disable=broad-except
+                traceback.print_exc()
+                status = 1
+
+            statuses.append((line_number, status))
+
+        return statuses
+
 
+_PIPE = contextvars.ContextVar("pipe", default=None)
 
-def add_action(parser, func: callable, **arg_options):
+
+def _get_pipe(result):
+    if result is None:
+        return None
+
+    if isinstance(result, collections.abc.Iterable) and not isinstance(
+        result, (str, bytes)
+    ):
+        return result
+
+    return (result,)
+
+
+def _get_exit_status(code):
+    if code is None:
+        return 0
+
+    if isinstance(code, int):
+        return code
+
+    print(code, file=sys.stderr)
+    return 1
+
+
+def add_action(parser, func: callable, fan_out=None, cache=None, **arg_options):
     """
     Registers arguments and options into ``parser`` from the signature of
     ``func``. A function wrapper is created from the ``func`` and stored in the
@@ -64,6 +327,31 @@ def add_action(parser, func: callable, **arg_options):
 
     *args parameters will be handled as nargs='*' arguments.
 
+    ``array.array`` default values accept comma separated items and inclusive
+    ``START-STOP`` integer ranges (``--ids 1,5-10 --ids 12``) and the ``func``
+    gets an array of the typecode of the default. ``range`` default values
+    accept a single ``START-STOP`` range and the ``func`` gets a ``range``.
+
+    ``Iterator[T]`` annotated parameters take a file name (``-`` for stdin)
+    and the ``func`` gets a generator of the lines of the file converted to
+    ``T``, so large inputs are not collected into the parsed namespace.
+    In ``Action.run_chain`` stdin is replaced by the result of the previous
+    command.
+
+    Coroutine functions are run until completion on a new event loop by the
+    ``action``. ``gather_actions`` runs several actions on the same loop.
+
+    The *args parameter can be fanned out over a ``"thread"`` or ``"process"``
+    pool with the ``fan_out`` parameter. The ``func`` is called once per chunk
+    of the *args items on the pool and the ``action`` returns the results of
+    the calls in the order of the items. The ``--jobs`` and ``--chunk-size``
+    cli options set the number of workers and the number of items per call.
+    ``FanOutError`` is raised with every failure if any of the calls failed.
+
+    The results of idempotent functions can be cached on disk with a
+    ``CachePolicy`` in the ``cache`` parameter. The ``--no-cache`` and
+    ``--clear-cache`` cli options bypass and clear the cache of ``func``.
+
     Keyword arguments of ``add_action`` are handled as extra argparse options
     of the parsed arguments of ``func``. The name of the keyword argument has to
     refer to a ``func`` argument which will be extended. The keyword argument
@@ -72,14 +360,99 @@ def add_action(parser, func: callable, **arg_options):
     ``func`` arguments.
     """
     sig = _add_arguments(parser, func, arg_options)
-    action = _wrap_action(func, sig)
+
+    if fan_out is None:
+        action = _wrap_action(func, sig)
+    else:
+        # pylint: disable-next=import-outside-toplevel
+        from .fan_out import add_fan_out_arguments, check_fan_out, wrap_fan_out_action
+
+        check_fan_out(func, sig, fan_out)
+        add_fan_out_arguments(parser)
+        action = wrap_fan_out_action(func, sig, fan_out)
+
+    if cache is not None:
+        # pylint: disable-next=import-outside-toplevel
+        from .cache import add_cache_arguments, wrap_cached_action
+
+        _check_cache(sig)
+        add_cache_arguments(parser)
+        action = wrap_cached_action(action, func, cache)
+
     parser.set_defaults(action=action)
 
 
+def _check_definition(func, arg_options):
+    """
+    Raise the errors of the ``fan_out`` and ``cache`` options, of the extra
+    options of unknown parameters and of the conflicting option strings of
+    ``func``, which ``add_action`` would raise or ignore only when the parser
+    of the command is built.
+    """
+    import inspect  # pylint: disable=import-outside-toplevel
+
+    sig = inspect.signature(func)
+    option_strings = ["-h", "--help"]
+
+    if arg_options.get("fan_out") is not None:
+        from .fan_out import check_fan_out  # pylint: disable=import-outside-toplevel
+
+        check_fan_out(func, sig, arg_options["fan_out"])
+        option_strings.extend(("--jobs", "--chunk-size"))
+
+    if arg_options.get("cache") is not None:
+        _check_cache(sig)
+        option_strings.extend(("--no-cache", "--clear-cache"))
+
+    names = {"fan_out", "cache"}
+
+    for name, param in sig.parameters.items():
+        if record_fields := get_record_fields(name, param):
+            names.update(field_param.name for _, field_param in record_fields)
+            option_strings.extend(
+                "--" + _conv_to_cli_name(field_param.name)
+                for _, field_param in record_fields
+            )
+        else:
+            names.add(name)
+
+            if param.default is not param.empty:
+                option_strings.append(_conv_to_cli_option(name, param))
+
+    if unknown := sorted(arg_options.keys() - names):
+        raise ValueError(f"Options of unknown parameters: {', '.join(unknown)}")
+
+    seen = set()
+
+    for option in option_strings:
+        if option in seen:
+            raise argparse.ArgumentError(
+                None, f"argument {option}: conflicting option string: {option}"
+            )
+
+        seen.add(option)
+
+
+def _check_cache(sig):
+    """
+    The cache is keyed by the bound arguments, so the generators of the
+    ``Iterator[T]`` parameters can not be cached.
+    """
+    for name, param in sig.parameters.items():
+        if _is_typed_iterator(param.annotation):
+            raise ValueError(f"Iterator parameter {name!r} can not be cached")
+
+
 def _add_arguments(parser, func, arg_options):
+    import inspect  # pylint: disable=import-outside-toplevel
+
     sig = inspect.signature(func)
 
     for name, param in sig.parameters.items():
+        if record_fields := get_record_fields(name, param):
+            _add_record_arguments(parser, record_fields, arg_options)
+            continue
+
         options = _get_options(param)
         options.update(arg_options.get(name, {}))
 
@@ -88,10 +461,32 @@ def _add_arguments(parser, func, arg_options):
     return sig
 
 
+def _add_record_arguments(parser, record_fields, arg_options):
+    """
+    Add the fields of a dataclass or ``NamedTuple`` parameter as options
+    prefixed by the parameter name. The fields without default are required
+    options.
+    """
+    for _, param in record_fields:
+        options = _get_options(param)
+
+        if param.default is param.empty:
+            options.update(required=True, dest=param.name)
+
+        options.update(arg_options.get(param.name, {}))
+        parser.add_argument("--" + _conv_to_cli_name(param.name), **options)
+
+
 def _get_options(param):
     if _is_bool(param):
         return _get_bool_options(param)
 
+    if isinstance(param.default, range):
+        return _get_range_options(param)
+
+    if _is_array(param.default):
+        return _get_array_options(param)
+
     return dict(
         itertools.chain(
             _get_annotation(param),
@@ -99,6 +494,7 @@ def _get_options(param):
             _get_default(param),
             _get_choices(param),
             _get_action(param),
+            _get_stream(param),
         )
     )
 
@@ -109,8 +505,82 @@ def _get_bool_options(param):
     return dict(default=param.default, action=action)
 
 
+def _get_range_options(param):
+    return dict(
+        type=_parse_range,
+        default=param.default,
+        metavar="START-STOP",
+        help=f"inclusive range, default: {_format_range(param.default)}",
+    )
+
+
+def _format_range(value):
+    if not value:
+        return "none"
+
+    if value.step != 1:
+        return repr(value)
+
+    return f"{value.start}-{value[-1]}"
+
+
+def _get_array_options(param):
+    return dict(
+        type=_get_array_parser(param.default.typecode),
+        action="append",
+        metavar="ITEMS",
+        help="comma separated items or START-STOP ranges",
+    )
+
+
+def _is_array(value):
+    """
+    ``array`` is not imported by ``argparse_action``: ``value`` cannot be an
+    array if nobody imported ``array`` yet.
+    """
+    array = sys.modules.get("array")
+
+    return array is not None and isinstance(value, array.array)
+
+
+def _parse_range(token):
+    head, separator, stop = token[1:].partition("-")
+
+    if not separator:
+        return range(int(token), int(token) + 1)
+
+    return range(int(token[0] + head), int(stop) + 1)
+
+
+_parse_range.__name__ = "range"
+
+
+def _get_array_parser(typecode):
+    array_type = sys.modules["array"].array
+    convert = float if typecode in "fd" else int
+
+    def parse(token):
+        items = array_type(typecode)
+
+        for item in token.split(","):
+            if convert is int and "-" in item[1:]:
+                items.extend(_parse_range(item))
+            else:
+                items.append(convert(item))
+
+        return items
+
+    parse.__name__ = "array"
+
+    return parse
+
+
 def _get_annotation(param):
-    if param.annotation == param.empty or _is_enum(param.annotation):
+    if (
+        param.annotation == param.empty
+        or _is_enum(param.annotation)
+        or _is_typed_iterator(param.annotation)
+    ):
         return
 
     if seq_type := _is_sequence(param.default) and _get_typed_sequence(
@@ -139,6 +609,16 @@ def _get_default(param):
     yield "help", "default: %(default)s"
 
 
+def _get_stream(param):
+    if not _is_typed_iterator(param.annotation):
+        return
+
+    if param.default == param.empty:
+        yield "help", "file of the items per line, '-' reads stdin"
+    else:
+        yield "metavar", "FILE"
+
+
 def _get_nargs(param):
     if param.kind == param.VAR_POSITIONAL:
         yield "nargs", "*"
@@ -146,10 +626,58 @@ def _get_nargs(param):
 
 def _get_choices(param):
     if _is_enum(param.annotation):
-        yield "choices", list(param.annotation.__members__)
+        yield "choices", _EnumChoices(param.annotation.__members__)
 
     elif enum_annotation := _get_typed_enum_sequence(param.annotation):
-        yield "choices", list(enum_annotation.__members__)
+        yield "choices", _EnumChoices(enum_annotation.__members__)
+
+
+class _EnumChoices(collections.abc.Container):
+    """
+    Choices of the member names of an enum. The validation of argparse is a
+    hashed lookup and the usage and error messages list only the first
+    ``LIMIT`` names of the large enums followed by the number of the rest.
+    ``names`` holds every name.
+    """
+
+    LIMIT = 20
+
+    def __init__(self, members):
+        self._members = members
+
+    @property
+    def names(self):
+        return list(self._members)
+
+    def __contains__(self, name):
+        return name in self._members
+
+    def __iter__(self):
+        if len(self._members) <= self.LIMIT:
+            return iter(self._members)
+
+        return itertools.chain(
+            itertools.islice(self._members, self.LIMIT),
+            (_OmittedChoices(len(self._members) - self.LIMIT),),
+        )
+
+    def __len__(self):
+        return min(len(self._members), self.LIMIT + 1)
+
+
+class _OmittedChoices(str):
+    """
+    Last item of the abbreviated choices, which is ``...`` in the usage and
+    ``... and <count> more`` unquoted in the invalid choice error.
+    """
+
+    def __new__(cls, count):
+        omitted = super().__new__(cls, "...")
+        omitted.count = count
+        return omitted
+
+    def __repr__(self):
+        return f"... and {self.count} more"
 
 
 def _get_action(param):
@@ -160,7 +688,7 @@ def _get_action(param):
 
 
 def _is_enum(annotation):
-    return inspect.isclass(annotation) and issubclass(annotation, enum.Enum)
+    return isinstance(annotation, type) and issubclass(annotation, enum.Enum)
 
 
 def _is_bool(param):
@@ -168,58 +696,241 @@ def _is_bool(param):
 
 
 def _wrap_action(func, sig):
-    def action(namespace):
-        args = [
-            _get_namespace_var(
-                namespace,
-                _conv_to_cli_name(name) if param.default == param.empty else name,
-                param,
-            )
-            for name, param in sig.parameters.items()
-            if param.kind not in {param.VAR_POSITIONAL, param.KEYWORD_ONLY}
-        ]
+    import inspect  # pylint: disable=import-outside-toplevel
 
-        varg_name = _get_varg_name(sig)
+    bind = _compile_binding(sig)
 
-        if varg_name is not None:
-            varg = _get_namespace_var(
-                namespace, _conv_to_cli_name(varg_name), sig.parameters[varg_name]
-            )
-            args.extend(varg)
+    if inspect.iscoroutinefunction(func):
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        def call(*args, **kwargs):
+            return asyncio.run(func(*args, **kwargs))
 
-        kwargs = {
-            name: _get_namespace_var(namespace, name, param)
-            for name, param in sig.parameters.items()
-            if param.kind == param.KEYWORD_ONLY
-        }
+        def action(namespace):
+            args, kwargs = bind(namespace)
+            return call(*args, **kwargs)
+
+    else:
+        call = func
 
-        return func(*args, **kwargs)
+        def action(namespace):
+            args, kwargs = bind(namespace)
+            return func(*args, **kwargs)
+
+    action.bind = bind
+    action.call = call
+    action.func = func
 
     return action
 
 
-def _get_varg_name(sig):
-    names = (
-        name
-        for name, param in sig.parameters.items()
-        if param.kind == param.VAR_POSITIONAL
+def _compile_binding(sig):
+    """
+    Compile the getters of the ``func`` arguments from the parsed namespace at
+    registration, so the action does not inspect the signature on every call.
+    """
+    positional_getters = []
+    varg_getter = None
+    keyword_getters = []
+
+    for name, param in sig.parameters.items():
+        if record_fields := get_record_fields(name, param):
+            getter = _get_record_getter(param.annotation, record_fields)
+        else:
+            getter = _get_namespace_getter(name, param)
+
+        if param.kind == param.VAR_POSITIONAL:
+            varg_getter = getter
+
+        elif param.kind == param.KEYWORD_ONLY:
+            keyword_getters.append((name, getter))
+
+        else:
+            positional_getters.append(getter)
+
+    positional_getters = tuple(positional_getters)
+    keyword_getters = tuple(keyword_getters)
+
+    def bind(namespace):
+        args = [get(namespace) for get in positional_getters]
+
+        if varg_getter is not None:
+            args.extend(varg_getter(namespace))
+
+        return args, {name: get(namespace) for name, get in keyword_getters}
+
+    return bind
+
+
+async def gather_actions(namespaces, limit=None):
+    """
+    Run the actions of the parsed ``namespaces`` concurrently on the running
+    event loop and return their results in the order of ``namespaces``. At most
+    ``limit`` actions run at the same time if ``limit`` is given.
+
+    Coroutine functions are awaited on the loop, the other functions and the
+    wrapped (cached, timed or profiled) actions are run in the default executor
+    of the loop.
+
+    >>> import argparse
+    >>> import asyncio
+    >>> parser = argparse.ArgumentParser()
+    >>> action = Action(parser)
+    >>> @action.add()
+    ... async def double(number: int):
+    ...     return 2 * number
+    >>> namespaces = [parser.parse_args(["double", str(i)]) for i in range(3)]
+    >>> asyncio.run(gather_actions(namespaces, limit=2))
+    [0, 2, 4]
+    """
+    import asyncio  # pylint: disable=import-outside-toplevel
+
+    semaphore = asyncio.Semaphore(limit) if limit else None
+
+    async def run(namespace):
+        if semaphore is None:
+            return await _await_action(namespace.action, namespace)
+
+        async with semaphore:
+            return await _await_action(namespace.action, namespace)
+
+    return await asyncio.gather(*(run(namespace) for namespace in namespaces))
+
+
+async def _await_action(action, namespace):
+    import asyncio  # pylint: disable=import-outside-toplevel
+    import inspect  # pylint: disable=import-outside-toplevel
+
+    if hasattr(action, "call") and inspect.iscoroutinefunction(action.func):
+        args, kwargs = action.bind(namespace)
+        return await action.func(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, action, namespace)
+
+
+def _get_record_getter(record_type, record_fields):
+    """
+    Construct the dataclass or ``NamedTuple`` instance from the options of its
+    fields.
+    """
+    getters = tuple(
+        (field, _get_namespace_getter(param.name, param, dest=param.name))
+        for field, param in record_fields
     )
 
-    return next(names, None)
+    return lambda namespace: record_type(
+        **{field: get(namespace) for field, get in getters}
+    )
+
+
+def _get_namespace_getter(name, param, dest=None):
+    getter = operator.attrgetter(dest or _get_dest(name, param))
+    converter = _get_converter(param)
+
+    if converter is None:
+        return getter
 
+    return lambda namespace: converter(getter(namespace))
 
-def _get_namespace_var(namespace, name, param):
-    var = getattr(namespace, name)
 
+def _get_dest(name, param):
+    if param.default is param.empty:
+        return _conv_to_cli_name(name)
+
+    return name
+
+
+def _get_converter(param):
     if _is_enum(param.annotation):
+        return _get_enum_converter(param.annotation.__members__)
+
+    if enum_annotation := _get_typed_enum_sequence(param.annotation):
+        get_member = enum_annotation.__members__.__getitem__
+        return lambda items: list(map(get_member, items))
+
+    if _is_typed_iterator(param.annotation):
+        return _get_stream_converter(param.annotation.__args__[0])
+
+    if _is_array(param.default):
+        return _get_array_converter(param.default)
+
+    return None
+
+
+def _get_enum_converter(members):
+    get_member = members.__getitem__
+
+    def convert(var):
         if _is_sequence(var):
-            var = [param.annotation[item] for item in var]
-        else:
-            var = param.annotation[var]
-    elif enum_annotation := _get_typed_enum_sequence(param.annotation):
-        var = [enum_annotation[item] for item in var]
+            return list(map(get_member, var))
+
+        return get_member(var)
+
+    return convert
+
+
+def _get_array_converter(default):
+    array_type = type(default)
+
+    def convert(chunks):
+        items = array_type(default.typecode)
+
+        for chunk in chunks or (default,):
+            items.extend(chunk)
+
+        return items
 
-    return var
+    return convert
+
+
+def _get_stream_converter(item_type):
+    if _is_enum(item_type):
+        convert = item_type.__members__.__getitem__
+    elif isinstance(item_type, type):
+        convert = item_type
+    else:
+        convert = str
+
+    def stream(path):
+        if not isinstance(path, str):
+            return path
+
+        pipe = _PIPE.get()
+
+        if path == "-" and pipe is not None:
+            return _convert_piped_items(pipe, convert)
+
+        return _read_items(path, convert)
+
+    return stream
+
+
+def _read_items(path, convert):
+    """
+    Generate the converted items of the lines of ``path`` (stdin for ``-``)
+    while the file is read in buffered chunks, so the memory usage does not
+    depend on the number of the items. Empty lines are skipped.
+    """
+    if path == "-":
+        yield from _convert_lines(sys.stdin, convert)
+        return
+
+    with open(path, encoding="utf-8") as item_file:
+        yield from _convert_lines(item_file, convert)
+
+
+def _convert_piped_items(items, convert):
+    for item in items:
+        yield convert(item) if isinstance(item, str) else item
+
+
+def _convert_lines(lines, convert):
+    for line in lines:
+        item = line.strip()
+
+        if item:
+            yield convert(item)
 
 
 def _conv_to_cli_option(name, param):
@@ -245,10 +956,9 @@ def _is_sequence(value):
 
 
 def _get_typed_sequence(annotation):
-    #  pylint: disable=protected-access
     if (
         sys.version_info >= (3, 9)
-        and isinstance(annotation, (types.GenericAlias, typing._GenericAlias))
+        and isinstance(annotation, _get_generic_alias_types())
         and issubclass(annotation.__origin__, collections.abc.Sequence)
         and len(annotation.__args__) == 1
     ):
@@ -257,6 +967,29 @@ def _get_typed_sequence(annotation):
     return None
 
 
+def _get_generic_alias_types():
+    """
+    ``typing`` is not imported by ``argparse_action``: annotation cannot be a
+    ``typing`` alias if nobody imported ``typing`` yet.
+    """
+    typing = sys.modules.get("typing")
+
+    if typing is None:
+        return (types.GenericAlias,)
+
+    #  pylint: disable=protected-access
+    return (types.GenericAlias, typing._GenericAlias)
+
+
+def _is_typed_iterator(annotation):
+    return (
+        sys.version_info >= (3, 9)
+        and isinstance(annotation, _get_generic_alias_types())
+        and annotation.__origin__ is collections.abc.Iterator
+        and len(annotation.__args__) == 1
+    )
+
+
 def _get_typed_enum_sequence(annotation):
     sequence_type = _get_typed_sequence(annotation)
     if _is_enum(sequence_type):
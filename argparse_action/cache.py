@@ -0,0 +1,272 @@
+"""
+On-disk result cache of the commands registered with a ``CachePolicy``.
+"""
+import hashlib
+import marshal
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import time
+
+from .commands import _forward_action_attributes
+
+
+class CachePolicy:
+    """
+    Cache the results of an idempotent command on disk. The results are keyed
+    by the function and its bound arguments, so the arguments and the results
+    have to be picklable.
+
+    Results older than ``ttl`` seconds are not served. The least recently used
+    results of the command are evicted above ``max_entries`` results or
+    ``max_bytes`` total size. The results are stored under ``directory``
+    (``$XDG_CACHE_HOME/argparse_action`` by default).
+
+    >>> import argparse, tempfile
+    >>> from argparse_action import Action
+    >>> tmp_dir = tempfile.TemporaryDirectory()
+    >>> parser = argparse.ArgumentParser()
+    >>> action = Action(parser)
+    >>> @action.add(cache=CachePolicy(ttl=60, directory=tmp_dir.name))
+    ... def square(n: int):
+    ...     print("computing")
+    ...     return n * n
+    >>> def run(command_line):
+    ...     namespace = parser.parse_args(command_line.split())
+    ...     return namespace.action(namespace)
+    >>> run("square 3")
+    computing
+    9
+    >>> run("square 3")
+    9
+    >>> run("square 3 --no-cache")
+    computing
+    9
+    >>> tmp_dir.cleanup()
+    """
+
+    def __init__(self, ttl=None, max_entries=None, max_bytes=None, directory=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory or os.path.join(
+            os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+            "argparse_action",
+        )
+
+
+def add_cache_arguments(parser):
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Run without the cached result"
+    )
+    parser.add_argument(
+        "--clear-cache", action="store_true", help="Clear the cached results"
+    )
+
+
+def wrap_cached_action(action, func, policy):
+    """
+    Serve the result of ``action`` from the cache of ``func`` if it has a
+    fresh result for the bound arguments. ``--no-cache`` runs ``action`` and
+    replaces the cached result, ``--clear-cache`` clears the cache first.
+
+    The cache of ``func`` is named after its definition including the hash of
+    its code object, so the commands of the same name of different scripts do
+    not share results and a changed function does not serve stale results.
+    """
+    cache = _ResultCache(policy, _get_cache_name(func))
+    call = getattr(action, "call", None)
+
+    def cached_action(namespace):
+        if namespace.clear_cache:
+            cache.clear()
+
+        args, kwargs = action.bind(namespace)
+        key = hashlib.sha256(pickle.dumps((args, kwargs))).hexdigest()
+
+        if not namespace.no_cache:
+            hit, result = cache.get(key)
+
+            if hit:
+                return result
+
+        result = action(namespace) if call is None else call(*args, **kwargs)
+        cache.set(key, result)
+
+        return result
+
+    return _forward_action_attributes(cached_action, action)
+
+
+def _get_cache_name(func):
+    name = f"{func.__module__}.{func.__qualname__}"
+    code = getattr(func, "__code__", None)
+
+    if code is None:
+        return name
+
+    return f"{name}-{hashlib.sha256(marshal.dumps(code)).hexdigest()[:16]}"
+
+
+def cache_help(parser, policy):
+    """
+    Cache the help rendered by ``parser.format_help`` with ``policy``. The key
+    is the hash of the arguments of ``parser``, the help strings of its
+    commands and the terminal width, which are cheaper to collect than the
+    wrapped help text is to render.
+    """
+    cache = _ResultCache(policy, "help")
+    format_help = parser.format_help
+
+    def cached_format_help():
+        key = hashlib.sha256(repr(_describe_parser(parser)).encode()).hexdigest()
+        hit, text = cache.get(key)
+
+        if not hit:
+            text = format_help()
+            cache.set(key, text)
+
+        return text
+
+    parser.format_help = cached_format_help
+
+
+def _describe_parser(parser):
+    description = [
+        parser.prog,
+        parser.usage,
+        parser.description,
+        parser.epilog,
+        parser.formatter_class.__name__,
+        shutil.get_terminal_size().columns,
+    ]
+
+    # pylint: disable-next=protected-access
+    for group in parser._action_groups + parser._mutually_exclusive_groups:
+        description.append(
+            (
+                getattr(group, "title", None),
+                getattr(group, "description", None),
+                getattr(group, "required", None),
+                # pylint: disable-next=protected-access
+                [action.dest for action in group._group_actions],
+            )
+        )
+
+    # pylint: disable-next=protected-access
+    for action in parser._actions:
+        description.append(
+            (
+                type(action).__name__,
+                action.option_strings,
+                action.dest,
+                action.nargs,
+                action.required,
+                action.default,
+                action.help,
+                action.metavar,
+                _describe_choices(action.choices),
+            )
+        )
+
+        # pylint: disable-next=protected-access
+        for choice_action in getattr(action, "_choices_actions", ()):
+            description.append((choice_action.metavar, choice_action.help))
+
+    return description
+
+
+def _describe_choices(choices):
+    if choices is None:
+        return None
+
+    return list(getattr(choices, "names", choices))
+
+
+class _ResultCache:
+    """
+    Pickled ``(created, result)`` pairs in one file per key. The modification
+    time of the files is the time of the last use for the LRU eviction.
+    """
+
+    def __init__(self, policy, name):
+        self._policy = policy
+        self._directory = os.path.join(policy.directory, re.sub(r"[^\w.-]", "_", name))
+
+    def get(self, key):
+        path = self._get_path(key)
+
+        try:
+            with open(path, "rb") as result_file:
+                created, result = pickle.load(result_file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+        if self._is_expired(created, time.time()):
+            _remove(path)
+            return False, None
+
+        os.utime(path)
+
+        return True, result
+
+    def set(self, key, result):
+        os.makedirs(self._directory, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=self._directory, suffix=".tmp", delete=False
+        ) as result_file:
+            pickle.dump((time.time(), result), result_file)
+
+        os.replace(result_file.name, self._get_path(key))
+        self._evict()
+
+    def clear(self):
+        for entry in self._scan():
+            _remove(entry.path)
+
+    def _get_path(self, key):
+        return os.path.join(self._directory, f"{key}.pickle")
+
+    def _is_expired(self, created, now):
+        return self._policy.ttl is not None and now - created > self._policy.ttl
+
+    def _evict(self):
+        max_entries = self._policy.max_entries
+        max_bytes = self._policy.max_bytes
+
+        if max_entries is None and max_bytes is None:
+            return
+
+        entries = sorted(
+            ((entry.stat(), entry.path) for entry in self._scan()),
+            key=lambda entry: entry[0].st_mtime,
+        )
+        count = len(entries)
+        total_bytes = sum(stat.st_size for stat, _ in entries)
+
+        for stat, path in entries:
+            if (max_entries is None or count <= max_entries) and (
+                max_bytes is None or total_bytes <= max_bytes
+            ):
+                break
+
+            _remove(path)
+            count -= 1
+            total_bytes -= stat.st_size
+
+    def _scan(self):
+        try:
+            with os.scandir(self._directory) as entries:
+                return [entry for entry in entries if entry.name.endswith(".pickle")]
+        except FileNotFoundError:
+            return []
+
+
+def _remove(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,278 @@
+"""
+Registry of the commands of an ``Action``: the ``CommandSpec`` of every
+registered command and the subparsers action which builds the parser of a
+command only when it is looked up, with the timings of the cli phases and the
+wrappers of the action of the selected command.
+"""
+import argparse
+import importlib
+import sys
+import time
+import types
+
+
+class CommandSpec:
+    """
+    Registered command: the ``name`` and ``aliases`` of the command, the
+    ``func`` or the ``"package.module:function"`` ``reference`` of a lazy
+    command, the ``help`` of the command list and the extra ``arg_options``
+    of ``add_action``. The ``parser_options`` of ``add_parser`` are set by
+    ``set_prog``.
+    """
+
+    __slots__ = (
+        "name",
+        "aliases",
+        "func",
+        "reference",
+        "help",
+        "arg_options",
+        "parser_options",
+    )
+
+    # pylint: disable-next=too-many-arguments,redefined-builtin
+    def __init__(self, name, aliases, func, reference, help, arg_options):
+        self.name = name
+        self.aliases = aliases
+        self.func = func
+        self.reference = reference
+        self.help = help
+        self.arg_options = arg_options or None
+        self.parser_options = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r}, {self.func or self.reference!r})"
+
+    def set_prog(self, **kwargs):
+        """
+        Stand-in of the parser class for ``add_parser`` to get the ``prog`` and
+        the other options of the command parser.
+        """
+        self.parser_options = kwargs
+
+        return self
+
+
+class _Timings(dict):
+    """
+    Accumulated seconds per phase.
+    """
+
+    INVOCATION_PHASES = ("parse", "bind", "call")
+
+    def measure(self, phase, func, /, *args, **kwargs):
+        started = time.perf_counter()
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self[phase] = self.get(phase, 0.0) + time.perf_counter() - started
+
+    def start_invocation(self):
+        for phase in self.INVOCATION_PHASES:
+            self.pop(phase, None)
+
+    def format(self):
+        return " ".join(
+            f"{phase}={seconds * 1000:.3f}ms" for phase, seconds in self.items()
+        )
+
+
+def _add_timings_argument(parser, timings):
+    parser.add_argument(
+        "--timings",
+        choices=("stderr", "log"),
+        help="Report the timings of the cli phases to stderr or as a log record",
+    )
+    parse_known_args = parser.parse_known_args
+
+    def timed_parse_known_args(*args, **kwargs):
+        timings.start_invocation()
+        return timings.measure("parse", parse_known_args, *args, **kwargs)
+
+    parser.parse_known_args = timed_parse_known_args
+
+
+def _time_action(action, timings, report):
+    call = getattr(action, "call", None)
+
+    def timed_action(namespace):
+        try:
+            if call is None:
+                return timings.measure("call", action, namespace)
+
+            args, kwargs = timings.measure("bind", action.bind, namespace)
+            return timings.measure("call", call, *args, **kwargs)
+        finally:
+            if report is not None:
+                _TIMING_REPORTERS[report](timings)
+
+    return _forward_action_attributes(timed_action, action)
+
+
+def _forward_action_attributes(wrapper, action):
+    """
+    Copy the ``bind`` and ``func`` attributes of ``action`` onto its
+    ``wrapper``. The ``call`` attribute is not copied, so neither the wrappers
+    of ``wrapper`` nor ``gather_actions`` bypass it.
+    """
+    for name in ("bind", "func"):
+        if hasattr(action, name):
+            setattr(wrapper, name, getattr(action, name))
+
+    return wrapper
+
+
+def _print_timings(timings):
+    print(f"timings {timings.format()}", file=sys.stderr)
+
+
+def _log_timings(timings):
+    import logging  # pylint: disable=import-outside-toplevel
+
+    logging.getLogger(__package__).info(
+        "timings %s", timings.format(), extra={"timings": dict(timings)}
+    )
+
+
+_TIMING_REPORTERS = types.MappingProxyType(
+    {"stderr": _print_timings, "log": _log_timings}
+)
+
+
+class _CommandParsers(argparse._SubParsersAction):  # pylint: disable=protected-access
+    """
+    Subparsers action which holds ``CommandSpec`` instances in the place of the
+    parsers and builds the parser of a command only when it is looked up. The
+    action of the command is wrapped with the profiler when ``--profile`` is
+    given and it is replaced by the ``xargs_action`` when ``--args-from`` is
+    given. The ``"profile"``, ``"timings"`` and ``"xargs"`` options of the
+    ``Action`` are enabled in ``features``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._name_parser_map = self.choices = _ParserMap(self)
+        self._specs = {}
+        self.features = set()
+        self.timings = None
+        self.help_cache = None
+
+    def add_command(self, spec):
+        """
+        Register ``spec`` by ``add_parser`` with ``spec.set_prog`` as parser
+        class, so the names, the aliases and the help of the command are
+        handled by argparse but no parser is created.
+        """
+        parser_class = self._parser_class
+        self._parser_class = spec.set_prog
+
+        try:
+            self.add_parser(spec.name, help=spec.help, aliases=spec.aliases)
+        finally:
+            self._parser_class = parser_class
+
+        self._specs[spec.name] = spec
+
+    def get_specs(self):
+        return dict(self._specs)
+
+    def build(self, spec):
+        from .action import add_action  # pylint: disable=import-outside-toplevel
+
+        parser = self._parser_class(**spec.parser_options)
+
+        if self.help_cache is not None:
+            # pylint: disable-next=import-outside-toplevel
+            from .cache import cache_help
+
+            cache_help(parser, self.help_cache)
+
+        func = spec.func or self.timings.measure(
+            "import", _import_reference, spec.reference
+        )
+        self.timings.measure(
+            "register", add_action, parser, func, **(spec.arg_options or {})
+        )
+
+        for name in (spec.name,) + spec.aliases:
+            dict.__setitem__(self._name_parser_map, name, parser)
+
+        return parser
+
+    def load(self, name):
+        return self._name_parser_map[name]
+
+    def load_all(self):
+        for name in list(self._name_parser_map):
+            self.load(name)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        if (
+            "xargs" in self.features
+            and namespace.args_from
+            and values[0] in self.choices
+        ):
+            # pylint: disable-next=import-outside-toplevel
+            from .xargs import xargs_action
+
+            setattr(namespace, self.dest, values[0])
+            namespace.action = xargs_action(
+                self.choices[values[0]], values[1:], namespace
+            )
+            return
+
+        options = (
+            argparse.Namespace(**vars(namespace))
+            if "profile" in self.features and namespace.profile
+            else None
+        )
+        report = namespace.timings if "timings" in self.features else None
+        super().__call__(parser, namespace, values, option_string)
+
+        if options is not None:
+            # pylint: disable-next=import-outside-toplevel
+            from .profiling import profile_action
+
+            namespace.action = profile_action(namespace.action, options, values[0])
+
+        if "timings" in self.features:
+            namespace.action = _time_action(namespace.action, self.timings, report)
+
+
+class _ParserMap(dict):
+    """
+    Parsers of the commands by name, the parser of a ``CommandSpec`` is built
+    when it is looked up, also by ``get``, ``values`` and ``items``.
+    """
+
+    def __init__(self, command_parsers):
+        super().__init__()
+        self._command_parsers = command_parsers
+
+    def __getitem__(self, name):
+        value = super().__getitem__(name)
+
+        if isinstance(value, CommandSpec):
+            return self._command_parsers.build(value)
+
+        return value
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def values(self):
+        return [self[name] for name in self]
+
+    def items(self):
+        return [(name, self[name]) for name in self]
+
+
+def _import_reference(reference):
+    module_name, _, qualname = reference.partition(":")
+    obj = importlib.import_module(module_name)
+
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+
+    return obj
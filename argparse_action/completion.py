@@ -0,0 +1,203 @@
+"""
+Generate static shell completion scripts from the parser tree of an
+``Action``.
+
+The scripts hold the commands, the options and the choices of every parser,
+so the completion runs in the shell without starting python. The lazily
+registered commands are loaded to collect their options. The output depends
+only on the parser tree, so it can be generated and cached at packaging time::
+
+    $ python3 -m argparse_action.completion my_cli.main:parser > my_cli.bash
+    $ python3 -m argparse_action.completion my_cli.main:parser --shell zsh
+"""
+import argparse
+import re
+import shlex
+import types
+
+from .action import add_action
+from .commands import _import_reference
+
+# pylint: disable-next=invalid-name,protected-access
+_SUBPARSERS_ACTION = argparse._SubParsersAction
+
+
+def generate_completion(parser, shell="bash", prog=None):
+    """
+    Return the ``bash`` or ``zsh`` completion script of ``parser`` for the
+    ``prog`` command (``parser.prog`` by default). The bash script can be
+    installed as a bash-completion file, the zsh script has to be sourced
+    after ``compinit``.
+    """
+    if shell not in _RENDERERS:
+        raise ValueError(f"Unknown shell {shell!r}, use one of {list(_RENDERERS)}")
+
+    prog = prog or parser.prog
+    function = "_" + re.sub(r"\W", "_", prog) + "_complete"
+    paths, transitions, value_options = _walk(parser)
+
+    return _RENDERERS[shell](prog, function, paths, transitions, value_options)
+
+
+def _walk(parser, path=""):
+    """
+    Collect the completion words of the parser tree in registration order:
+    the words per command path, the ``(path, word) -> path`` transitions of
+    the commands and the ``(path, option) -> choices`` of the options which
+    take a value (``None`` choices complete file names).
+    """
+    words = []
+    transitions = {}
+    value_options = {}
+    children = []
+
+    # pylint: disable-next=protected-access
+    for action in parser._actions:
+        if action.help == argparse.SUPPRESS:
+            continue
+
+        if isinstance(action, _SUBPARSERS_ACTION):
+            if hasattr(action, "load_all"):
+                action.load_all()
+
+            names = {}
+            for name, subparser in action.choices.items():
+                names.setdefault(id(subparser), (name, subparser))
+                child_path = f"{path} {names[id(subparser)][0]}".strip()
+                transitions[(path, name)] = child_path
+                words.append(name)
+
+            children.extend(
+                (f"{path} {name}".strip(), subparser)
+                for name, subparser in names.values()
+            )
+
+        elif action.option_strings:
+            words.extend(action.option_strings)
+
+            if action.nargs != 0:
+                for option in action.option_strings:
+                    value_options[(path, option)] = _get_choice_names(action)
+
+        elif action.choices is not None:
+            words.extend(_get_choice_names(action))
+
+    paths = {path: words}
+
+    for child_path, subparser in children:
+        for collected, child_collected in zip(
+            (paths, transitions, value_options), _walk(subparser, child_path)
+        ):
+            collected.update(child_collected)
+
+    return paths, transitions, value_options
+
+
+def _get_choice_names(action):
+    if action.choices is None:
+        return None
+
+    return list(getattr(action.choices, "names", action.choices))
+
+
+def _render_bash(prog, function, paths, transitions, value_options):
+    lines = [
+        f"# bash completion of {prog}, generated by argparse_action.completion",
+        f"{function}() {{",
+        '    local cur="${COMP_WORDS[COMP_CWORD]}" prev="${COMP_WORDS[COMP_CWORD-1]}"',
+        '    local cmd_path="" i',
+        "",
+        "    for ((i = 1; i < COMP_CWORD; i++)); do",
+        '        case "$cmd_path:${COMP_WORDS[i]}" in',
+        *_render_transitions(transitions),
+        "        esac",
+        "    done",
+        "",
+        '    case "$cmd_path:$prev" in',
+    ]
+
+    for (path, option), choices in value_options.items():
+        if choices is None:
+            reply = 'COMPREPLY=($(compgen -f -- "$cur"))'
+        else:
+            reply = f'COMPREPLY=($(compgen -W {_quote_words(choices)} -- "$cur"))'
+
+        lines.append(f"        {_quote(f'{path}:{option}')}) {reply}; return ;;")
+
+    lines.extend(["    esac", "", '    case "$cmd_path" in'])
+
+    for path, words in paths.items():
+        lines.append(
+            f"        {_quote(path)})"
+            f' COMPREPLY=($(compgen -W {_quote_words(words)} -- "$cur")) ;;'
+        )
+
+    lines.extend(["    esac", "}", "", f"complete -F {function} {shlex.quote(prog)}"])
+
+    return "\n".join(lines) + "\n"
+
+
+def _render_zsh(prog, function, paths, transitions, value_options):
+    lines = [
+        f"#compdef {prog}",
+        f"# zsh completion of {prog}, generated by argparse_action.completion",
+        f"{function}() {{",
+        '    local cmd_path="" i',
+        "",
+        "    for ((i = 2; i < CURRENT; i++)); do",
+        '        case "$cmd_path:${words[i]}" in',
+        *_render_transitions(transitions),
+        "        esac",
+        "    done",
+        "",
+        '    case "$cmd_path:${words[CURRENT-1]}" in',
+    ]
+
+    for (path, option), choices in value_options.items():
+        reply = "_files" if choices is None else f"compadd -- {_join_words(choices)}"
+        lines.append(f"        {_quote(f'{path}:{option}')}) {reply}; return ;;")
+
+    lines.extend(["    esac", "", '    case "$cmd_path" in'])
+
+    for path, words in paths.items():
+        lines.append(f"        {_quote(path)}) compadd -- {_join_words(words)} ;;")
+
+    lines.extend(["    esac", "}", "", f"compdef {function} {shlex.quote(prog)}"])
+
+    return "\n".join(lines) + "\n"
+
+
+def _render_transitions(transitions):
+    for (path, word), child_path in transitions.items():
+        pattern = _quote(f"{path}:{word}")
+        yield f"            {pattern}) cmd_path={_quote(child_path)} ;;"
+
+
+def _quote(word):
+    return shlex.quote(word) if word else "''"
+
+
+def _quote_words(words):
+    return _quote(" ".join(words))
+
+
+def _join_words(words):
+    return " ".join(map(_quote, words))
+
+
+_RENDERERS = types.MappingProxyType({"bash": _render_bash, "zsh": _render_zsh})
+
+
+def main(reference, shell="bash", prog=""):
+    """
+    Print the ``shell`` completion script of the parser referred by
+    ``reference`` in ``"package.module:parser"`` format.
+    """
+    print(generate_completion(_import_reference(reference), shell, prog), end="")
+
+
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description=__doc__)
+    add_action(_parser, main)
+    _namespace = _parser.parse_args()
+    _namespace.action(_namespace)
@@ -0,0 +1,139 @@
+"""
+Serve the commands of an ``Action`` from a warm process over a Unix socket.
+
+The server keeps the parser tree and the imported command modules in memory
+and executes every invocation in a forked child process. The client forwards
+its argv, working directory and environment, and passes its standard streams
+to the server, so the output of the command is streamed directly into the
+streams of the client::
+
+    $ python3 -m argparse_action.daemon /tmp/my_cli.sock echo hello
+    hello
+
+The file descriptors are passed with ``socket.send_fds`` which requires
+python 3.9.
+"""
+import io
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import traceback
+
+_SIZE = struct.Struct("!i")
+
+
+def serve(action, address):
+    """
+    Serve the commands of ``action`` on the ``address`` Unix socket until the
+    process is stopped. The parsers of the commands are built before serving
+    and the commands are executed by ``Action.run`` in a forked child of the
+    server, so the commands run unchanged.
+    """
+    action.build_parsers()
+
+    with _Server(address, action) as server:
+        server.serve_forever()
+
+
+def call(address, argv=None, stdin=None, stdout=None, stderr=None):
+    """
+    Execute ``argv`` (``sys.argv[1:]`` by default) on the server of ``address``
+    with the working directory and the environment of the current process and
+    return the exit status of the command. The standard streams of the command
+    are ``stdin``, ``stdout`` and ``stderr`` (the ones of the current process by
+    default).
+    """
+    streams = (stdin or sys.stdin, stdout or sys.stdout, stderr or sys.stderr)
+
+    for stream in streams[1:]:
+        stream.flush()
+
+    request = json.dumps(
+        {
+            "argv": sys.argv[1:] if argv is None else list(argv),
+            "cwd": os.getcwd(),
+            "env": dict(os.environ),
+        }
+    ).encode()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(address)
+        socket.send_fds(
+            client,
+            [_SIZE.pack(len(request))],
+            [stream.fileno() for stream in streams],
+        )
+        client.sendall(request)
+        (status,) = _SIZE.unpack(_recv_exactly(client, _SIZE.size))
+
+    return status
+
+
+class _Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    def __init__(self, address, action):
+        super().__init__(address, _Handler)
+        self.action = action
+
+    def server_close(self):
+        super().server_close()
+
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        size, fds, _flags, _address = socket.recv_fds(self.request, _SIZE.size, 3)
+        (size,) = _SIZE.unpack(size)
+        request = json.loads(_recv_exactly(self.request, size))
+
+        _redirect_streams(fds)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+
+        try:
+            status = self.server.action.run(request["argv"])
+        except Exception:  # pylint: disable=broad-except
+            traceback.print_exc()
+            status = 1
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        self.request.sendall(_SIZE.pack(status))
+
+
+def _redirect_streams(fds):
+    for target, source in enumerate(fds):
+        os.dup2(source, target)
+        os.close(source)
+
+    # The streams live until the forked child exits.
+    # pylint: disable=consider-using-with
+    sys.stdin = io.open(0, "r", encoding="utf-8", closefd=False)
+    sys.stdout = io.open(1, "w", encoding="utf-8", closefd=False)
+    sys.stderr = io.open(2, "w", encoding="utf-8", buffering=1, closefd=False)
+    # pylint: enable=consider-using-with
+
+
+def _recv_exactly(sock, size):
+    data = bytearray()
+
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed by the peer")
+
+        data.extend(chunk)
+
+    return bytes(data)
+
+
+if __name__ == "__main__":
+    sys.exit(call(sys.argv[1], sys.argv[2:]))
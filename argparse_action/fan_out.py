@@ -0,0 +1,118 @@
+"""
+Fan out the *args items of a command over a thread or process pool, see the
+``fan_out`` parameter of ``add_action``.
+"""
+import types
+
+from .action import _compile_binding
+
+
+class FanOutError(Exception):
+    """
+    Raised by the action of a fanned out command if any of its calls failed.
+    ``failures`` holds the ``(items, exception)`` pairs of the failed calls.
+    """
+
+    def __init__(self, failures):
+        super().__init__(
+            f"{len(failures)} call(s) failed: "
+            + "; ".join(f"{items!r}: {error!r}" for items, error in failures)
+        )
+        self.failures = failures
+
+
+_POOL_EXECUTORS = types.MappingProxyType(
+    {"thread": "ThreadPoolExecutor", "process": "ProcessPoolExecutor"}
+)
+
+
+def check_fan_out(func, sig, fan_out):
+    """
+    Raise ``ValueError`` if ``func`` can not be fanned out over the ``fan_out``
+    pool: it needs a *args parameter and it can not be a coroutine function.
+    """
+    import inspect  # pylint: disable=import-outside-toplevel
+
+    if fan_out not in _POOL_EXECUTORS:
+        raise ValueError(
+            f"Unknown pool {fan_out!r}, use one of {list(_POOL_EXECUTORS)}"
+        )
+
+    if not any(param.kind == param.VAR_POSITIONAL for param in sig.parameters.values()):
+        raise ValueError("Only function with *args parameter can be fanned out")
+
+    if inspect.iscoroutinefunction(func):
+        raise ValueError("Coroutine function can not be fanned out")
+
+
+def add_fan_out_arguments(parser):
+    parser.add_argument(
+        "--jobs", type=_parse_positive_int, help="number of parallel workers"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=_parse_positive_int,
+        default=1,
+        help="default: %(default)s",
+    )
+
+
+def _parse_positive_int(token):
+    value = int(token)
+
+    if value < 1:
+        raise ValueError(token)
+
+    return value
+
+
+_parse_positive_int.__name__ = "positive int"
+
+
+def wrap_fan_out_action(func, sig, fan_out):
+    """
+    Wrap ``func`` into an action which calls it once per ``--chunk-size``
+    items of its *args parameter on the ``fan_out`` pool of ``--jobs``
+    workers.
+    """
+    import concurrent.futures  # pylint: disable=import-outside-toplevel
+
+    executor_class = getattr(concurrent.futures, _POOL_EXECUTORS[fan_out])
+    bind = _compile_binding(sig)
+    fixed_count = sum(
+        param.kind not in {param.VAR_POSITIONAL, param.KEYWORD_ONLY}
+        for param in sig.parameters.values()
+    )
+
+    def action(namespace):
+        args, kwargs = bind(namespace)
+        fixed_args, items = args[:fixed_count], args[fixed_count:]
+        chunk_size = namespace.chunk_size
+        chunks = [
+            items[start : start + chunk_size]
+            for start in range(0, len(items), chunk_size)
+        ]
+
+        with executor_class(max_workers=namespace.jobs) as executor:
+            futures = [
+                executor.submit(func, *fixed_args, *chunk, **kwargs) for chunk in chunks
+            ]
+
+        results = []
+        failures = []
+
+        for chunk, future in zip(chunks, futures):
+            try:
+                results.append(future.result())
+            except Exception as error:  # pylint: disable=broad-except
+                failures.append((chunk, error))
+
+        if failures:
+            raise FanOutError(failures)
+
+        return results
+
+    action.bind = bind
+    action.func = func
+
+    return action
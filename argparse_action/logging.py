@@ -1,4 +1,13 @@
+import atexit
+import itertools
+import json
 import logging.handlers
+import os
+import queue
+import select
+import socket
+import threading
+import time
 import types
 
 _LOG_LEVEL = types.MappingProxyType(
@@ -12,6 +21,12 @@ _LOG_LEVEL = types.MappingProxyType(
     }
 )
 
+_OVERFLOW_POLICIES = ("block", "drop-oldest", "drop-new")
+
+_SYSLOG_PROTOCOLS = types.MappingProxyType(
+    {"udp": socket.SOCK_DGRAM, "tcp": socket.SOCK_STREAM}
+)
+
 
 def add_log_arguments(parser):
     parser.add_argument(
@@ -24,13 +39,37 @@ def add_log_arguments(parser):
     parser.add_argument(
         "--log-format",
         default="%(asctime)s %(name)s %(levelname)s %(message)s",
-        help="default is '%(default)s'",
+        help="'json' logs the --log-fields as JSON lines, default is '%(default)s'",
+    )
+
+    parser.add_argument(
+        "--log-fields",
+        default="asctime,name,levelname,message",
+        help="Record attributes of the json --log-format, default is '%(default)s'",
     )
 
     parser.add_argument(
         "--log-datefmt", default="%Y-%m-%d %H:%M:%S", help="default is '%(default)s'"
     )
 
+    parser.add_argument(
+        "--log-async",
+        action="store_true",
+        help="Write the logs from a background thread",
+    )
+    parser.add_argument(
+        "--log-queue-size",
+        type=int,
+        default=10000,
+        help="Size of the --log-async queue, default is '%(default)s'",
+    )
+    parser.add_argument(
+        "--log-overflow",
+        choices=_OVERFLOW_POLICIES,
+        default="block",
+        help="Handling of the full --log-async queue, default is '%(default)s'",
+    )
+
     destination_group = parser.add_mutually_exclusive_group()
     destination_group.add_argument(
         "--log-syslog",
@@ -46,30 +85,457 @@ def add_log_arguments(parser):
         "--log-console", action="store_true", help="Log into console"
     )
 
+    parser.add_argument(
+        "--log-syslog-address",
+        default="/dev/log",
+        metavar="ADDRESS",
+        help="Unix socket path or HOST:PORT of --log-syslog, "
+        "default is '%(default)s'",
+    )
+    parser.add_argument(
+        "--log-syslog-protocol",
+        choices=_SYSLOG_PROTOCOLS,
+        default="udp",
+        help="Protocol of the HOST:PORT --log-syslog-address, "
+        "default is '%(default)s'",
+    )
+
+    parser.add_argument(
+        "--log-buffer-size",
+        type=int,
+        default=0,
+        help="Number of --log-file or --log-syslog records to buffer and write "
+        "in a batch, default is '%(default)s'",
+    )
+    parser.add_argument(
+        "--log-flush-interval",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="Flush the --log-buffer-size buffer periodically, "
+        "default is '%(default)s'",
+    )
+
+    rotation_group = parser.add_mutually_exclusive_group()
+    rotation_group.add_argument(
+        "--log-rotate-size",
+        type=int,
+        metavar="BYTES",
+        help="Rotate --log-file when it reaches BYTES",
+    )
+    rotation_group.add_argument(
+        "--log-rotate-when",
+        metavar="WHEN",
+        help="Rotate --log-file by time, e.g. 'midnight', 'H' or 'W0'",
+    )
+    parser.add_argument(
+        "--log-backup-count",
+        type=int,
+        default=5,
+        help="Number of rotated log files to keep, default is '%(default)s'",
+    )
+    parser.add_argument(
+        "--log-compress",
+        action="store_true",
+        help="Compress the rotated log files with gzip",
+    )
+
+    parser.add_argument(
+        "--log-sample-rate",
+        type=float,
+        default=1.0,
+        help="Ratio of the records below --log-sample-level to keep, "
+        "default is '%(default)s'",
+    )
+    parser.add_argument(
+        "--log-sample-level",
+        choices=_LOG_LEVEL,
+        default="warning",
+        help="default is '%(default)s'",
+    )
+    parser.add_argument(
+        "--log-rate-limit",
+        type=float,
+        default=0,
+        metavar="RATE",
+        help="Records per second to keep per --log-rate-key, "
+        "default is '%(default)s' (unlimited)",
+    )
+    parser.add_argument(
+        "--log-rate-burst",
+        type=int,
+        default=10,
+        help="Records to keep in a burst over --log-rate-limit, "
+        "default is '%(default)s'",
+    )
+    parser.add_argument(
+        "--log-rate-key",
+        choices=("logger", "template"),
+        default="logger",
+        help="Rate limit per logger name or message template (logging call), "
+        "default is '%(default)s'",
+    )
+    parser.add_argument(
+        "--log-summary-interval",
+        type=float,
+        default=10,
+        metavar="SECONDS",
+        help="Minimum time between the suppressed record summaries, "
+        "default is '%(default)s'",
+    )
+
 
 def init_logging(namespace, default_handler=None):
     log_level = _LOG_LEVEL[namespace.log_level]
 
-    formatter = logging.Formatter(namespace.log_format, datefmt=namespace.log_datefmt)
+    formatter = _create_formatter(namespace)
 
     handler = _create_handler(namespace) or default_handler or logging.StreamHandler()
     handler.setLevel(log_level)
     handler.setFormatter(formatter)
 
+    if namespace.log_async:
+        handler = _QueueHandler(
+            handler, namespace.log_queue_size, namespace.log_overflow
+        )
+        handler.setLevel(log_level)
+
+    if namespace.log_sample_rate < 1 or namespace.log_rate_limit:
+        handler.addFilter(_ThrottleFilter(handler, namespace))
+
     logger = logging.getLogger()
     logger.addHandler(handler)
     logger.setLevel(log_level)
 
 
+class _ThrottleFilter(logging.Filter):
+    """
+    Drop the records of ``handler`` by sampling and by token bucket rate limits
+    per logger name or message template. The template is identified by the
+    logging call, so formatted messages of the same call share a bucket. The
+    number of the suppressed records is logged periodically and at exit.
+    """
+
+    def __init__(self, handler, namespace):
+        super().__init__()
+        import random  # pylint: disable=import-outside-toplevel
+
+        self._random = random.random
+        self._sample_rate = namespace.log_sample_rate
+        self._sample_level = _LOG_LEVEL[namespace.log_sample_level]
+        self._buckets = _TokenBuckets(
+            namespace.log_rate_limit, namespace.log_rate_burst
+        )
+        self._get_key = _RATE_KEYS[namespace.log_rate_key]
+        self._summary = _SuppressionSummary(handler, namespace.log_summary_interval)
+
+    def filter(self, record):
+        if record is self._summary.record:
+            return True
+
+        now = time.monotonic()
+        self._summary.report_if_due(now)
+
+        if record.levelno < self._sample_level and self._random() >= self._sample_rate:
+            return self._summary.suppress()
+
+        if self._buckets.rate and not self._buckets.take(self._get_key(record), now):
+            return self._summary.suppress()
+
+        return True
+
+
+class _TokenBuckets:
+    """
+    Token buckets of ``rate`` tokens per second up to ``burst`` tokens per key.
+
+    The buckets are kept in least recently used order. Above ``MAX_BUCKETS``
+    the refilled buckets are dropped, as they are equal to a new bucket, then
+    the least recently used ones down to the half of the limit.
+    """
+
+    MAX_BUCKETS = 1024
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def take(self, key, now):
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - allowed, now)
+
+            if len(self._buckets) > self.MAX_BUCKETS:
+                self._prune(now)
+
+        return allowed
+
+    def _prune(self, now):
+        self._buckets = {
+            key: (tokens, last)
+            for key, (tokens, last) in self._buckets.items()
+            if tokens + (now - last) * self.rate < self.burst
+        }
+
+        excess = len(self._buckets) - self.MAX_BUCKETS // 2
+
+        for key in list(itertools.islice(self._buckets, max(excess, 0))):
+            del self._buckets[key]
+
+
+class _SuppressionSummary:
+    """
+    Count the suppressed records and log their number through ``handler``
+    every ``interval`` seconds and at exit.
+    """
+
+    def __init__(self, handler, interval):
+        self.record = None
+        self._handler = handler
+        self._interval = interval
+        self._next_report = time.monotonic() + interval
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+        atexit.register(self._report_at_exit)
+
+    def suppress(self):
+        with self._lock:
+            self._suppressed += 1
+
+        return False
+
+    def report_if_due(self, now):
+        if self._suppressed and now >= self._next_report:
+            self.report()
+
+    def report(self):
+        with self._lock:
+            suppressed, self._suppressed = self._suppressed, 0
+            self._next_report = time.monotonic() + self._interval
+
+        if not suppressed:
+            return
+
+        self.record = logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": logging.getLevelName(logging.WARNING),
+                "msg": "%d log records were suppressed",
+                "args": (suppressed,),
+            }
+        )
+        self._handler.handle(self.record)
+
+    def _report_at_exit(self):
+        if self._handler in logging.getLogger().handlers:
+            self.report()
+
+
+_RATE_KEYS = types.MappingProxyType(
+    {
+        "logger": lambda record: record.name,
+        "template": lambda record: (record.pathname, record.lineno),
+    }
+)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler whose records are written by ``handler`` from the thread of a
+    queue listener. Closing the queue handler (``logging.shutdown`` does it at
+    exit) stops the listener after the queued records are written and closes
+    ``handler``.
+    """
+
+    def __init__(self, handler, queue_size, overflow):
+        super().__init__(queue.Queue(queue_size))
+        self.overflow = overflow
+        self.dropped = 0
+        self.listener = _QueueListener(self.queue, handler, respect_handler_level=True)
+        self.listener.start()
+
+    def enqueue(self, record):
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                pass
+
+            self.dropped += 1
+
+            if self.overflow == "drop-new":
+                return
+
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+
+    def close(self):
+        with self.lock:
+            listener, self.listener = self.listener, None
+
+        if listener is not None:
+            listener.stop()
+            self._report_dropped(listener.handlers)
+
+            for handler in listener.handlers:
+                handler.close()
+
+        super().close()
+
+    def _report_dropped(self, handlers):
+        if not self.dropped:
+            return
+
+        record = logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": logging.getLevelName(logging.WARNING),
+                "msg": "%d log records were dropped by --log-overflow=%s",
+                "args": (self.dropped, self.overflow),
+            }
+        )
+
+        for handler in handlers:
+            handler.handle(record)
+            handler.flush()
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def _create_formatter(namespace):
+    if namespace.log_format == "json":
+        return _JsonFormatter(
+            namespace.log_fields.split(","), datefmt=namespace.log_datefmt
+        )
+
+    return logging.Formatter(namespace.log_format, datefmt=namespace.log_datefmt)
+
+
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+}
+
+_RECORD_ATTRIBUTE_COUNT = len(vars(logging.makeLogRecord({})))
+
+_NUMBER_FIELDS = frozenset(
+    {"created", "levelno", "lineno", "msecs", "process", "relativeCreated", "thread"}
+)
+
+
+class _JsonFormatter(logging.Formatter):
+    """
+    Format the ``fields`` of the records and their ``extra`` attributes as a
+    JSON object in a single line. The encoded keys and the value encoders of
+    the fields are prepared once, so a record is encoded without building an
+    intermediate dict.
+
+    The ``extra`` attributes are looked up after the attributes set by
+    ``LogRecord``, and ``asctime`` is formatted once per second.
+    """
+
+    def __init__(self, fields, datefmt=None):
+        super().__init__(datefmt=datefmt)
+        self._asctime = (None, None)
+        self._fields = tuple(
+            (
+                field,
+                json.encoder.encode_basestring_ascii(field) + ":",
+                _encode_number if field in _NUMBER_FIELDS else _encode_value,
+            )
+            for field in fields
+        )
+        self._has_message = "message" in fields
+        self._has_asctime = "asctime" in fields
+        self._ignored_extras = _RECORD_ATTRIBUTES | frozenset(fields)
+
+    def format(self, record):
+        if self._has_message:
+            record.message = record.getMessage()
+
+        if self._has_asctime:
+            record.asctime = self.formatTime(record, self.datefmt)
+
+        parts = [
+            key + encode(getattr(record, field, None))
+            for field, key, encode in self._fields
+        ]
+        parts.extend(
+            _encode_value(key) + ":" + _encode_value(getattr(record, key))
+            for key in itertools.islice(record.__dict__, _RECORD_ATTRIBUTE_COUNT, None)
+            if key not in self._ignored_extras
+        )
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+
+        if record.exc_text:
+            parts.append('"exc_text":' + _encode_value(record.exc_text))
+
+        if record.stack_info:
+            parts.append('"stack_info":' + _encode_value(record.stack_info))
+
+        return "{" + ",".join(parts) + "}"
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt is None:
+            return super().formatTime(record, datefmt)
+
+        second = int(record.created)
+        cached_second, asctime = self._asctime
+
+        if second != cached_second:
+            asctime = super().formatTime(record, datefmt)
+            self._asctime = (second, asctime)
+
+        return asctime
+
+
+def _encode_number(value):
+    return repr(value) if value is not None else "null"
+
+
+def _encode_value(value):
+    if isinstance(value, str):
+        return json.encoder.encode_basestring_ascii(value)
+
+    return json.dumps(value, default=str)
+
+
 def _create_handler(namespace):
     if namespace.log_none:
         return logging.NullHandler()
 
     if namespace.log_file:
-        return logging.FileHandler(namespace.log_file)
+        return _buffer_handler(_create_file_handler(namespace), namespace)
 
     if namespace.log_syslog:
-        return create_syslog_handler(namespace.log_syslog)
+        handler = create_syslog_handler(
+            namespace.log_syslog,
+            namespace.log_syslog_address,
+            namespace.log_syslog_protocol,
+        )
+        return _buffer_handler(handler, namespace)
 
     if namespace.log_console:
         return logging.StreamHandler()
@@ -77,6 +543,294 @@ def _create_handler(namespace):
     return None
 
 
-def create_syslog_handler(facility="user", address="/dev/log"):
+def _create_file_handler(namespace):
+    if namespace.log_rotate_size:
+        handler_class = (
+            _CompressedRotatingFileHandler
+            if namespace.log_compress
+            else _RotatingFileHandler
+        )
+        handler = handler_class(
+            namespace.log_file,
+            maxBytes=namespace.log_rotate_size,
+            backupCount=namespace.log_backup_count,
+        )
+
+    elif namespace.log_rotate_when:
+        handler_class = (
+            _CompressedTimedRotatingFileHandler
+            if namespace.log_compress
+            else _TimedRotatingFileHandler
+        )
+        handler = handler_class(
+            namespace.log_file,
+            when=namespace.log_rotate_when,
+            backupCount=namespace.log_backup_count,
+        )
+
+    else:
+        handler = _FileHandler(namespace.log_file)
+
+    return handler
+
+
+def _buffer_handler(handler, namespace):
+    if namespace.log_buffer_size:
+        return _BufferingHandler(
+            namespace.log_buffer_size, namespace.log_flush_interval, handler
+        )
+
+    return handler
+
+
+class _BufferingHandler(logging.handlers.MemoryHandler):
+    """
+    Buffer the records of ``target`` until the buffer is full, an ERROR record
+    arrives or the ``flush_interval`` elapses. The buffer is passed to the
+    ``handle_batch`` method of ``target`` if it has one. Closing the handler
+    closes ``target``.
+    """
+
+    def __init__(self, capacity, flush_interval, target):
+        super().__init__(capacity, flushLevel=logging.ERROR, target=target)
+        self._closed = threading.Event()
+
+        if flush_interval:
+            threading.Thread(
+                target=self._flush_periodically, args=(flush_interval,), daemon=True
+            ).start()
+
+    def _flush_periodically(self, flush_interval):
+        while not self._closed.wait(flush_interval):
+            self.flush()
+
+    def flush(self):
+        if not hasattr(self.target, "handle_batch"):
+            super().flush()
+            return
+
+        with self.lock:
+            if self.buffer:
+                self.target.handle_batch(self.buffer)
+                self.buffer = []
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def close(self):
+        self._closed.set()
+        target = self.target
+        super().close()
+
+        if target is not None:
+            target.close()
+
+
+class _BatchFileMixin:
+    """
+    Write a batch of records under a single lock of the handler and flush the
+    stream once, the rotating handlers still roll over between the records.
+    """
+
+    def handle_batch(self, records):
+        rotating = isinstance(self, logging.handlers.BaseRotatingHandler)
+
+        with self.lock:
+            for record in records:
+                if self.filter(record):
+                    self._write(record, rotating)
+
+            if self.stream is not None:
+                self.stream.flush()
+
+    def _write(self, record, rotating):
+        try:
+            if rotating and self.shouldRollover(record):
+                self.doRollover()
+
+            if self.stream is None:
+                self.stream = self._open()
+
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+
+class _FileHandler(_BatchFileMixin, logging.FileHandler):
+    pass
+
+
+class _RotatingFileHandler(_BatchFileMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+
+class _TimedRotatingFileHandler(
+    _BatchFileMixin, logging.handlers.TimedRotatingFileHandler
+):
+    pass
+
+
+class _CompressRotatedMixin:
+    """
+    Compress the rotated log files with gzip in a background thread, so the
+    compression does not block the logging. The next rollover waits for the
+    previous compression to keep the order of the rotated files.
+    """
+
+    _compression = None
+
+    def rotation_filename(self, default_name):
+        return default_name + ".gz"
+
+    def rotate(self, source, dest):
+        if not os.path.exists(source):
+            return
+
+        rotated = dest + ".rotated"
+        os.rename(source, rotated)
+
+        self._compression = threading.Thread(target=_compress, args=(rotated, dest))
+        self._compression.start()
+
+    def doRollover(self):  # pylint: disable=invalid-name # overrides the stdlib name
+        self._wait_for_compression()
+        super().doRollover()
+
+    def close(self):
+        self._wait_for_compression()
+        super().close()
+
+    def _wait_for_compression(self):
+        if self._compression is not None:
+            self._compression.join()
+
+
+# pylint: disable=too-many-ancestors # the mixins extend the stdlib hierarchy
+class _CompressedRotatingFileHandler(_CompressRotatedMixin, _RotatingFileHandler):
+    pass
+
+
+class _CompressedTimedRotatingFileHandler(
+    _CompressRotatedMixin, _TimedRotatingFileHandler
+):
+    pass
+
+
+# pylint: enable=too-many-ancestors
+
+
+def _compress(source, dest):
+    import gzip  # pylint: disable=import-outside-toplevel
+    import shutil  # pylint: disable=import-outside-toplevel
+
+    with open(source, "rb") as source_file, gzip.open(dest, "wb") as dest_file:
+        shutil.copyfileobj(source_file, dest_file)
+
+    os.remove(source)
+
+
+def create_syslog_handler(facility="user", address="/dev/log", protocol="udp"):
+    """
+    Create a syslog handler of ``facility`` which logs into the unix socket
+    ``address`` or to a ``"host:port"`` (or ``(host, port)``) address over
+    ``protocol``, ``"udp"`` or ``"tcp"``. The type of the unix socket is
+    detected, ``protocol`` applies only to the network addresses.
+    """
     facility = logging.handlers.SysLogHandler.facility_names[facility]
-    return logging.handlers.SysLogHandler(facility=facility, address=address)
+    socktype = None
+
+    if isinstance(address, str) and not address.startswith("/") and ":" in address:
+        host, _, port = address.rpartition(":")
+        address = (host.strip("[]"), int(port))
+
+    if not isinstance(address, str):
+        socktype = _SYSLOG_PROTOCOLS[protocol]
+
+    return _SysLogHandler(facility=facility, address=address, socktype=socktype)
+
+
+class _SysLogHandler(logging.handlers.SysLogHandler):
+    """
+    Syslog handler which writes a batch of records in a single send over TCP.
+    The TCP messages are framed by octet counting (RFC 6587), and the
+    persistent connection is reopened when the server has closed it or a send
+    fails. The UDP and unix socket messages are sent one by one.
+    """
+
+    def emit(self, record):
+        try:
+            self._send([self._encode(record)])
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+    def handle_batch(self, records):
+        messages = []
+
+        for record in records:
+            if not self.filter(record):
+                continue
+
+            try:
+                messages.append(self._encode(record))
+            except Exception:  # pylint: disable=broad-except
+                self.handleError(record)
+
+        if not messages:
+            return
+
+        with self.lock:
+            try:
+                self._send(messages)
+            except Exception:  # pylint: disable=broad-except
+                self.handleError(records[-1])
+
+    def _encode(self, record):
+        priority = self.encodePriority(
+            self.facility, self.mapPriority(record.levelname)
+        )
+        message = f"<{priority}>{self.ident}{self.format(record)}".encode()
+
+        if self.socktype == socket.SOCK_STREAM and not self.unixsocket:
+            return b"%d %s" % (len(message), message)
+
+        return message + b"\000" if self.append_nul else message
+
+    def _send(self, messages):
+        if self.unixsocket:
+            for message in messages:
+                try:
+                    self.socket.send(message)
+                except OSError:
+                    self.socket.close()
+                    self._connect_unixsocket(self.address)
+                    self.socket.send(message)
+
+        elif self.socktype == socket.SOCK_DGRAM:
+            for message in messages:
+                self.socket.sendto(message, self.address)
+
+        else:
+            self._send_stream(b"".join(messages))
+
+    def _send_stream(self, data):
+        if self.socket.fileno() < 0 or _is_closed_by_peer(self.socket):
+            self._reconnect()
+
+        try:
+            self.socket.sendall(data)
+        except OSError:
+            self._reconnect()
+            self.socket.sendall(data)
+
+    def _reconnect(self):
+        self.socket.close()
+        self.socket = socket.create_connection(self.address)
+
+
+def _is_closed_by_peer(sock):
+    """
+    The syslog server does not send data, so a readable connection has been
+    closed or reset by the server.
+    """
+    readable, _, _ = select.select([sock], [], [], 0)
+    return bool(readable)
@@ -0,0 +1,156 @@
+"""
+Profile the dispatched command of an ``Action`` created with ``profile=True``.
+
+The ``--profile`` option runs the action under ``cProfile`` (``cprofile``
+mode) or under a statistical profiler which samples the stack of the command
+from a background thread (``sample`` mode). The stats are written into a file
+named after the command: ``<command>.prof`` can be loaded by ``pstats`` and
+``<command>.folded`` holds collapsed stacks for flame graph tools::
+
+    $ python3 main.py --profile cprofile --profile-top 10 my-command
+"""
+import collections
+import os
+import sys
+import threading
+import types
+
+from .commands import _forward_action_attributes
+
+_MODES = ("cprofile", "sample")
+
+
+def add_profile_arguments(parser):
+    """
+    Add the ``--profile`` options to ``parser``.
+    """
+    parser.add_argument(
+        "--profile",
+        choices=_MODES,
+        help="Profile the command with cProfile or by stack sampling",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=".",
+        metavar="DIR",
+        help="Directory of the profile stats, default is '.'",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Print the top N functions by cumulative time to stderr",
+    )
+    parser.add_argument(
+        "--profile-interval",
+        type=float,
+        default=0.005,
+        metavar="SECONDS",
+        help="Sampling interval of the 'sample' mode, default is '0.005'",
+    )
+
+
+def profile_action(action, options, command):
+    """
+    Wrap ``action`` to run it under the profiler selected by the ``options``
+    namespace and write the stats into a file named after ``command``.
+    """
+    run = _PROFILERS[options.profile]
+    path = os.path.join(options.profile_dir, command)
+
+    def profiled_action(namespace):
+        return run(action, namespace, path, options)
+
+    return _forward_action_attributes(profiled_action, action)
+
+
+def _run_cprofile(action, namespace, path, options):
+    import cProfile  # pylint: disable=import-outside-toplevel
+    import pstats  # pylint: disable=import-outside-toplevel
+
+    profiler = cProfile.Profile()
+
+    try:
+        return profiler.runcall(action, namespace)
+    finally:
+        profiler.dump_stats(f"{path}.prof")
+
+        if options.profile_top:
+            stats = pstats.Stats(profiler, stream=sys.stderr)
+            stats.sort_stats("cumulative").print_stats(options.profile_top)
+
+
+def _run_sample(action, namespace, path, options):
+    # pylint: disable-next=protected-access
+    sampler = _Sampler(sys._getframe(), options.profile_interval)
+    sampler.start()
+
+    try:
+        return action(namespace)
+    finally:
+        sampler.stop()
+        sampler.dump_stacks(f"{path}.folded")
+
+        if options.profile_top:
+            sampler.print_top(options.profile_top, sys.stderr)
+
+
+class _Sampler(threading.Thread):
+    """
+    Count the stacks of the thread of ``root_frame`` below ``root_frame`` in
+    every ``interval`` seconds.
+    """
+
+    def __init__(self, root_frame, interval):
+        super().__init__(daemon=True)
+        self._root_frame = root_frame
+        self._thread_id = threading.get_ident()
+        self._interval = interval
+        self._stopped = threading.Event()
+        self.stacks = collections.Counter()
+
+    def run(self):
+        while not self._stopped.wait(self._interval):
+            # pylint: disable-next=protected-access
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+
+            while frame is not None and frame is not self._root_frame:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def dump_stacks(self, path):
+        with open(path, "w", encoding="utf-8") as stack_file:
+            for stack, count in self.stacks.items():
+                stack_file.write(f"{';'.join(map(_format_code, stack))} {count}\n")
+
+    def print_top(self, top, stream):
+        total = sum(self.stacks.values())
+        cumulative = collections.Counter()
+
+        for stack, count in self.stacks.items():
+            for code in set(stack):
+                cumulative[code] += count
+
+        print(f"{total} samples", file=stream)
+        print("   samples  cumulative  function", file=stream)
+
+        for code, count in cumulative.most_common(top):
+            print(
+                f"{count:10} {count / total:10.1%}  {_format_code(code)}", file=stream
+            )
+
+
+def _format_code(code):
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+_PROFILERS = types.MappingProxyType({"cprofile": _run_cprofile, "sample": _run_sample})
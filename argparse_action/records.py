@@ -0,0 +1,94 @@
+"""
+Fields of the dataclass and ``NamedTuple`` parameters, which are flattened into
+options prefixed by the parameter name.
+"""
+import sys
+
+
+def get_record_fields(name, param):
+    """
+    Return the ``(field, parameter)`` pairs of the fields of a dataclass or
+    ``NamedTuple`` annotation as keyword-only parameters named ``<name>_<field>``,
+    or an empty tuple for other annotations. The defaults of the fields are taken
+    from the default instance of the parameter if it has one.
+    """
+    import inspect  # pylint: disable=import-outside-toplevel
+
+    annotation = param.annotation
+
+    if param.kind == param.VAR_POSITIONAL or not isinstance(annotation, type):
+        return ()
+
+    if hasattr(annotation, "__dataclass_fields__"):
+        fields = _get_dataclass_fields(annotation, param.empty)
+    elif issubclass(annotation, tuple) and hasattr(annotation, "_fields"):
+        fields = _get_named_tuple_fields(annotation, param.empty)
+    else:
+        return ()
+
+    if param.default is not param.empty:
+        if not isinstance(param.default, annotation):
+            raise ValueError(
+                f"Default of the {name} parameter has to be"
+                f" a {annotation.__name__} instance"
+            )
+
+        fields = (
+            (field, field_annotation, getattr(param.default, field))
+            for field, field_annotation, _ in fields
+        )
+
+    return tuple(
+        (
+            field,
+            inspect.Parameter(
+                f"{name}_{field}",
+                inspect.Parameter.KEYWORD_ONLY,
+                default=default,
+                annotation=field_annotation,
+            ),
+        )
+        for field, field_annotation, default in fields
+    )
+
+
+def _get_dataclass_fields(annotation, empty):
+    dataclasses = sys.modules["dataclasses"]
+    hints = _get_type_hints(annotation)
+
+    for field in dataclasses.fields(annotation):
+        if not field.init:
+            continue
+
+        if field.default is not dataclasses.MISSING:
+            default = field.default
+        elif field.default_factory is not dataclasses.MISSING:
+            default = field.default_factory()
+        else:
+            default = empty
+
+        yield field.name, hints.get(field.name, field.type), default
+
+
+def _get_named_tuple_fields(annotation, empty):
+    hints = _get_type_hints(annotation)
+    # pylint: disable-next=protected-access
+    defaults = annotation._field_defaults
+
+    for field in annotation._fields:
+        yield field, hints.get(field, empty), defaults.get(field, empty)
+
+
+def _get_type_hints(annotation):
+    """
+    Resolve the string annotations of postponed evaluation only, so ``typing``
+    is not imported for the plain annotations.
+    """
+    hints = getattr(annotation, "__annotations__", {})
+
+    if any(isinstance(hint, str) for hint in hints.values()):
+        import typing  # pylint: disable=import-outside-toplevel
+
+        return typing.get_type_hints(annotation)
+
+    return hints
@@ -0,0 +1,162 @@
+"""
+Run a command of an ``Action`` created with ``xargs=True`` once per argument
+line, like ``xargs -P``, without starting a new interpreter per line.
+
+The arguments of a line are appended to the arguments of the command and
+parsed by the parser of the command. The invocations run in a pool of forked
+worker processes which share the already imported command module. The output
+of an invocation is collected and written in the order of the lines or as the
+invocations complete. Threads are used where ``fork`` is not available, their
+output is not separated reliably::
+
+    $ python3 main.py --args-from urls.txt --jobs 8 download --retry 3
+"""
+import concurrent.futures
+import contextlib
+import io
+import multiprocessing
+import shlex
+import sys
+import traceback
+
+from .action import _get_exit_status
+
+_PARSER = None
+
+
+def add_xargs_arguments(parser):
+    """
+    Add the ``--args-from`` options to ``parser``.
+    """
+    parser.add_argument(
+        "--args-from",
+        metavar="FILE",
+        help="Run the command once per argument line of FILE, '-' reads stdin",
+    )
+    parser.add_argument(
+        "--jobs",
+        dest="xargs_jobs",
+        type=int,
+        metavar="N",
+        help="Number of parallel --args-from invocations",
+    )
+    parser.add_argument(
+        "--unordered",
+        dest="xargs_unordered",
+        action="store_true",
+        help="Write the output of the invocations as they complete",
+    )
+
+
+def xargs_action(parser, arguments, options):
+    """
+    Create the action which runs ``parser`` with ``arguments`` extended by
+    every line of ``--args-from``. The action exits with status 1 if any
+    invocation failed after a summary of the failures is written to stderr.
+    """
+
+    def action(_namespace):
+        lines = list(_read_argument_lines(options.args_from, arguments))
+        argvs = [(line_number, argv) for line_number, argv in lines if argv]
+        statuses = iter(
+            _run_invocations(parser, argvs, options.xargs_jobs, options.xargs_unordered)
+        )
+        failures = []
+
+        for line_number, argv in lines:
+            status = next(statuses) if argv else 2
+
+            if status:
+                failures.append((line_number, status))
+
+        if failures:
+            print(
+                f"{len(failures)} of {len(lines)} invocations failed: "
+                + ", ".join(
+                    f"line {line_number} (status {status})"
+                    for line_number, status in failures
+                ),
+                file=sys.stderr,
+            )
+            raise SystemExit(1)
+
+    return action
+
+
+def _read_argument_lines(path, arguments):
+    """
+    Generate the ``(line_number, argv)`` pairs of the non-empty lines. The
+    ``argv`` of a badly quoted line is ``None`` after its error is written to
+    stderr.
+    """
+    with contextlib.ExitStack() as stack:
+        lines = (
+            sys.stdin
+            if path == "-"
+            else stack.enter_context(open(path, encoding="utf-8"))
+        )
+
+        for line_number, line in enumerate(lines, start=1):
+            try:
+                line_arguments = shlex.split(line, comments=True)
+            except ValueError as error:
+                print(f"line {line_number}: {error}", file=sys.stderr)
+                yield line_number, None
+                continue
+
+            if line_arguments:
+                yield line_number, arguments + line_arguments
+
+
+def _run_invocations(parser, argvs, jobs, unordered):
+    global _PARSER  # pylint: disable=global-statement
+
+    _PARSER = parser
+    statuses = [0] * len(argvs)
+
+    try:
+        with _create_executor(jobs) as executor:
+            futures = {
+                executor.submit(_invoke, argv): index
+                for index, (_, argv) in enumerate(argvs)
+            }
+            done = concurrent.futures.as_completed(futures) if unordered else futures
+
+            for future in done:
+                status, stdout, stderr = future.result()
+                sys.stdout.write(stdout)
+                sys.stderr.write(stderr)
+                statuses[futures[future]] = status
+    finally:
+        _PARSER = None
+
+    sys.stdout.flush()
+
+    return statuses
+
+
+def _create_executor(jobs):
+    if "fork" in multiprocessing.get_all_start_methods():
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs, mp_context=multiprocessing.get_context("fork")
+        )
+
+    return concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+
+
+def _invoke(argv):
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            namespace = _PARSER.parse_args(argv)
+            namespace.action(namespace)
+            status = 0
+        except SystemExit as error:
+            status = _get_exit_status(error.code)
+        except Exception:  # pylint: disable=broad-except
+            traceback.print_exc()
+            status = 1
+
+    return status, stdout.getvalue(), stderr.getvalue()
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"Benchmark suite of argparse_action"
+
+import argparse
+import enum
+import inspect
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+import typing
+
+import argparse_action
+
+COMMAND_COUNT = 50
+PARAMETER_COUNT = 5
+
+
+class Level(enum.Enum):
+    debug = enum.auto()
+    info = enum.auto()
+    error = enum.auto()
+
+
+LargeLevel = enum.Enum("LargeLevel", [f"level{index}" for index in range(5000)])
+
+
+def _positional(index):
+    return inspect.Parameter(f"p{index}", inspect.Parameter.POSITIONAL_OR_KEYWORD)
+
+
+def _bool_flag(index):
+    return inspect.Parameter(
+        f"p{index}", inspect.Parameter.POSITIONAL_OR_KEYWORD, default=False
+    )
+
+
+def _enum(index):
+    return inspect.Parameter(
+        f"p{index}",
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        default=Level.info,
+        annotation=Level,
+    )
+
+
+def _large_enum(index):
+    return inspect.Parameter(
+        f"p{index}",
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        default=LargeLevel.level0,
+        annotation=LargeLevel,
+    )
+
+
+def _typed_sequence(index):
+    return inspect.Parameter(
+        f"p{index}",
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        default=(),
+        annotation=typing.Sequence[int],
+    )
+
+
+def _varargs(index):
+    if index == 0:
+        return inspect.Parameter(
+            "items", inspect.Parameter.VAR_POSITIONAL, annotation=int
+        )
+
+    return _positional(index)
+
+
+def _keyword_only(index):
+    return inspect.Parameter(
+        f"p{index}", inspect.Parameter.KEYWORD_ONLY, default="default"
+    )
+
+
+PARAMETER_KINDS = {
+    "positional": (_positional, lambda index: [f"value{index}"]),
+    "bool_flag": (_bool_flag, lambda index: [f"--p{index}"]),
+    "enum": (_enum, lambda index: [f"--p{index}", "debug"]),
+    "large_enum": (_large_enum, lambda index: [f"--p{index}", "level4999"]),
+    "typed_sequence": (_typed_sequence, lambda index: [f"--p{index}", "1"] * 2),
+    "varargs": (_varargs, lambda index: [str(index)]),
+    "keyword_only": (_keyword_only, lambda index: [f"--p{index}", "value"]),
+}
+
+
+def create_command(name, create_parameter, parameter_count=PARAMETER_COUNT):
+    parameters = sorted(
+        (create_parameter(index) for index in range(parameter_count)),
+        key=lambda param: param.kind,
+    )
+
+    def command(*args, **kwargs):
+        return args, kwargs
+
+    command.__name__ = name
+    command.__signature__ = inspect.Signature(parameters)
+
+    return command
+
+
+def create_argv(create_argument, parameter_count=PARAMETER_COUNT):
+    return [
+        argument
+        for index in range(parameter_count)
+        for argument in create_argument(index)
+    ]
+
+
+def measure(func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def bench_import(repeat):
+    best = float("inf")
+
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import argparse_action"],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        match = re.search(
+            r"^import time:\s+\d+ \|\s+(\d+) \| argparse_action$",
+            result.stderr,
+            re.MULTILINE,
+        )
+        best = min(best, int(match.group(1)) / 1e6)
+
+    yield "import", best
+
+
+def bench_registration(repeat):
+    for kind, (create_parameter, _) in PARAMETER_KINDS.items():
+        commands = [
+            create_command(f"command{index}", create_parameter)
+            for index in range(COMMAND_COUNT)
+        ]
+
+        def register(commands=commands):
+            action = argparse_action.Action(argparse.ArgumentParser())
+            for command in commands:
+                action.add()(command)
+            action.build_parsers()
+
+        yield f"register.{kind}", measure(register, repeat) / COMMAND_COUNT
+
+
+def bench_dispatch(repeat):
+    for kind, (create_parameter, create_argument) in PARAMETER_KINDS.items():
+        parser = argparse.ArgumentParser()
+        action = argparse_action.Action(parser)
+        action.add()(create_command("command", create_parameter))
+        argv = ["command"] + create_argv(create_argument)
+
+        def parse(parser=parser, argv=argv):
+            return parser.parse_args(argv)
+
+        namespace = parse()
+
+        def dispatch(namespace=namespace):
+            return namespace.action(namespace)
+
+        yield f"parse.{kind}", measure(parse, repeat)
+        yield f"dispatch.{kind}", measure(dispatch, repeat)
+
+
+def bench_init_logging(repeat):
+    parser = argparse.ArgumentParser()
+    argparse_action.add_log_arguments(parser)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        handler_argvs = {
+            "stream": ["--log-console"],
+            "null": ["--log-none"],
+            "file": ["--log-file", os.path.join(tmp_dir, "bench.log")],
+        }
+
+        for handler, argv in handler_argvs.items():
+            namespace = parser.parse_args(argv)
+            yield f"init_logging.{handler}", measure(
+                lambda namespace=namespace: _init_logging(namespace), repeat
+            )
+
+        namespace = parser.parse_args([])
+        yield "init_logging.syslog", measure(
+            lambda: _init_logging(
+                namespace,
+                argparse_action.create_syslog_handler(address=("localhost", 514)),
+            ),
+            repeat,
+        )
+
+
+def bench_formatter(repeat):
+    parser = argparse.ArgumentParser()
+    argparse_action.add_log_arguments(parser)
+    record = logging.makeLogRecord(
+        {"name": "bench", "levelno": logging.INFO, "levelname": "INFO"}
+    )
+    record.msg = "formatted %s message"
+    record.args = ("bench",)
+
+    for name, argv in (("default", []), ("json", ["--log-format", "json"])):
+        handler = logging.NullHandler()
+        argparse_action.init_logging(parser.parse_args(argv), default_handler=handler)
+        _remove_root_handlers()
+
+        yield f"formatter.{name}", measure(
+            lambda formatter=handler.formatter: formatter.format(record), repeat
+        )
+
+
+def bench_help(repeat):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        help_caches = {
+            "default": None,
+            "cached": argparse_action.CachePolicy(directory=tmp_dir),
+        }
+
+        for name, help_cache in help_caches.items():
+            parser = argparse.ArgumentParser()
+            action = argparse_action.Action(parser, help_cache=help_cache)
+
+            for index in range(COMMAND_COUNT):
+                command = create_command(f"command{index}", _positional)
+                command.__doc__ = f"Help of command {index}. " * 10
+                action.add()(command)
+
+            yield f"help.{name}", measure(parser.format_help, repeat)
+
+
+def bench_memory(repeat):
+    """
+    Bytes allocated per registered command, reported in the place of the
+    seconds per operation. The ``built`` entry includes the parsers built by
+    ``build_parsers``.
+    """
+    commands = [
+        create_command(f"command{index}", _positional) for index in range(COMMAND_COUNT)
+    ]
+    registrations = {
+        "add": (lambda action, command: action.add()(command), False),
+        "add_lazy": (
+            lambda action, command: action.add_lazy(f"{__name__}:{command.__name__}"),
+            False,
+        ),
+        "built": (lambda action, command: action.add()(command), True),
+    }
+
+    for name, (register, build) in registrations.items():
+        best = float("inf")
+
+        for _ in range(repeat):
+            tracemalloc.start()
+            action = argparse_action.Action(argparse.ArgumentParser())
+            baseline, _ = tracemalloc.get_traced_memory()
+
+            for command in commands:
+                register(action, command)
+
+            if build:
+                action.build_parsers()
+
+            allocated, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            best = min(best, (allocated - baseline) / COMMAND_COUNT)
+
+        yield f"memory.{name}", best
+
+
+def _init_logging(namespace, default_handler=None):
+    argparse_action.init_logging(namespace, default_handler=default_handler)
+    _remove_root_handlers()
+
+
+def _remove_root_handlers():
+    logger = logging.getLogger()
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+BENCHMARKS = {
+    "import": bench_import,
+    "registration": bench_registration,
+    "dispatch": bench_dispatch,
+    "init_logging": bench_init_logging,
+    "formatter": bench_formatter,
+    "help": bench_help,
+    "memory": bench_memory,
+}
+
+
+def main(
+    *benchmarks, output="-", baseline="", threshold: float = 0.2, repeat: int = 5
+):
+    """
+    Run the ``benchmarks`` (all by default) and write the seconds per operation
+    into ``output`` as JSON. The results are compared with the ``baseline``
+    JSON and the exit status is 1 if a result is slower than its baseline by
+    more than the ``threshold`` ratio. A missing ``baseline`` file is an error.
+    """
+    if baseline and not os.path.exists(baseline):
+        print(
+            f"Missing baseline {baseline}, create it with 'make bench-baseline'",
+            file=sys.stderr,
+        )
+        return 2
+
+    results = {
+        name: seconds
+        for benchmark in benchmarks or BENCHMARKS
+        for name, seconds in BENCHMARKS[benchmark](repeat)
+    }
+    report = {"python": sys.version.split()[0], "results": results}
+
+    if output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if baseline:
+        return compare(results, baseline, threshold)
+
+    return 0
+
+
+def compare(results, baseline, threshold):
+    with open(baseline, encoding="utf-8") as baseline_file:
+        baseline_results = json.load(baseline_file)["results"]
+
+    regressions = 0
+
+    for name, seconds in results.items():
+        if name not in baseline_results:
+            continue
+
+        ratio = seconds / baseline_results[name]
+        regressed = ratio > 1 + threshold
+        regressions += regressed
+        status = "REGRESSION" if regressed else "ok"
+        print(f"{status:10} {name:30} {ratio:6.2f}x", file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    argparse_action.add_action(
+        parser, main, benchmarks={"help": f"any of {', '.join(BENCHMARKS)}"}
+    )
+    namespace = parser.parse_args()
+    sys.exit(namespace.action(namespace))
@@ -0,0 +1,23 @@
+"Commands can be chained in one process"
+import argparse
+import argparse_action
+import typing
+
+parser = argparse.ArgumentParser(description=__doc__)
+action = argparse_action.Action(parser)
+
+@action.add()
+def numbers(count: int):
+    return range(count)
+
+@action.add()
+def square(numbers: typing.Iterator[int] = "-"):
+    return (number * number for number in numbers)
+
+@action.add()
+def show(items: typing.Iterator[str] = "-"):
+    for item in items:
+        print(item)
+
+if __name__ == "__main__":
+    exit(action.run_chain())
@@ -0,0 +1,18 @@
+"array and range defaults accept delimited items and ranges"
+import argparse
+import argparse_action
+import array
+
+parser = argparse.ArgumentParser(description=__doc__)
+action = argparse_action.Action(parser)
+
+@action.add()
+def total(ids=array.array("q"), skip=range(0)):
+    return sum(item for item in ids if item not in skip)
+
+def main():
+    namespace = parser.parse_args()
+    print(namespace.action(namespace))
+
+if __name__ == "__main__":
+    main()
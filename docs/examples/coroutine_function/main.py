@@ -0,0 +1,23 @@
+"Coroutine function can be exposed as command"
+import argparse
+import asyncio
+import argparse_action
+
+parser = argparse.ArgumentParser(description=__doc__)
+action = argparse_action.Action(parser)
+
+@action.add()
+async def greet(*names, delay: float = 0.01):
+    async def greet_one(name):
+        await asyncio.sleep(delay)
+        return f"hello {name}"
+
+    for greeting in await asyncio.gather(*map(greet_one, names)):
+        print(greeting)
+
+def main():
+    namespace = parser.parse_args()
+    namespace.action(namespace)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"Arbitrary argument can be fanned out over a process pool"
+import argparse
+import argparse_action
+
+parser = argparse.ArgumentParser(description=__doc__)
+action = argparse_action.Action(parser)
+
+@action.add(fan_out="process")
+def count(*words):
+    return sum(len(word) for word in words)
+
+def main():
+    namespace = parser.parse_args()
+    print(namespace.action(namespace))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"Command can be registered lazily by reference"
+import argparse
+import argparse_action
+
+parser = argparse.ArgumentParser(description=__doc__)
+action = argparse_action.Action(parser)
+
+action.add_lazy("os.path:basename", "base", help="Strip directory from path")
+action.add_lazy("os.path:dirname", help="Get directory of path")
+
+def main():
+    namespace = parser.parse_args()
+    print(namespace.action(namespace))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"Profile the commands with the --profile option"
+import argparse
+import argparse_action
+
+parser = argparse.ArgumentParser(description=__doc__)
+action = argparse_action.Action(parser, profile=True)
+
+@action.add()
+def fibonacci(n: int):
+    return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)
+
+def main():
+    namespace = parser.parse_args()
+    print(namespace.action(namespace))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"Dataclass and NamedTuple parameters are flattened into prefixed options"
+import argparse
+import dataclasses
+import argparse_action
+
+parser = argparse.ArgumentParser(description=__doc__)
+action = argparse_action.Action(parser)
+
+@dataclasses.dataclass
+class Connection:
+    host: str
+    port: int = 80
+    secure: bool = False
+
+@action.add()
+def connect(connection: Connection):
+    print(connection)
+
+if __name__ == "__main__":
+    exit(action.run())
@@ -0,0 +1,19 @@
+"Generate static shell completion scripts"
+import argparse
+import argparse_action
+from argparse_action.completion import generate_completion
+
+parser = argparse.ArgumentParser(prog="my-cli", description=__doc__)
+action = argparse_action.Action(parser)
+
+@action.add("e")
+def echo(word, upper=False):
+    print(word.upper() if upper else word)
+
+@action.add(shell={"choices": ["bash", "zsh"]})
+def completion(shell="bash"):
+    print(generate_completion(parser, shell), end="")
+
+if __name__ == "__main__":
+    namespace = parser.parse_args()
+    namespace.action(namespace)
@@ -0,0 +1,22 @@
+"Iterator parameters are streamed from a file or stdin"
+import argparse
+import argparse_action
+import typing
+
+parser = argparse.ArgumentParser(description=__doc__)
+action = argparse_action.Action(parser)
+
+@action.add()
+def total(numbers: typing.Iterator[int] = "-"):
+    return sum(numbers)
+
+@action.add()
+def count(words: typing.Iterator[str]):
+    return sum(1 for _ in words)
+
+def main():
+    namespace = parser.parse_args()
+    print(namespace.action(namespace))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"Report the time spent in the phases of the cli with --timings"
+import argparse
+import argparse_action
+
+parser = argparse.ArgumentParser(description=__doc__)
+action = argparse_action.Action(parser, timings=True)
+
+@action.add()
+def echo(word):
+    print(word)
+
+if __name__ == "__main__":
+    exit(action.run())
@@ -0,0 +1,13 @@
+"Run a command per argument line of a file in a process pool"
+import argparse
+import argparse_action
+
+parser = argparse.ArgumentParser(description=__doc__)
+action = argparse_action.Action(parser, xargs=True)
+
+@action.add()
+def echo(word, upper=False):
+    print(word.upper() if upper else word)
+
+if __name__ == "__main__":
+    exit(action.run())
@@ -1,11 +1,15 @@
 import unittest
 import argparse
+import array
+import asyncio
 import contextlib
 import typing
 import io
 import enum
 import collections.abc
+import contextvars
 import sys
+import tempfile
 
 import argparse_action
 
@@ -237,6 +241,27 @@ class ArgparseActionTest(unittest.TestCase):  # pylint: disable=too-many-public-
         self.assertEqual("info", namespace.level)
         self.assertEqual(Level.info, namespace.action(namespace))
 
+    @unittest.skipIf(
+        sys.version_info < (3, 9), f"Unsupported feature on python {sys.version_info}"
+    )
+    def test_choices_of_large_enum_are_abbreviated(self):
+        self.decorate(func_with_large_enum_arg, "action")
+
+        with io.StringIO() as buf, contextlib.redirect_stderr(buf):
+            with self.assertRaises(SystemExit):
+                self.parse_args("action unknown")
+
+            error = buf.getvalue()
+
+        self.assertIn("'code19', ... and 980 more)", error)
+        self.assertNotIn("code20", error)
+
+        namespace = self.parse_args("action code999 --others code1 --others code2")
+        self.assertEqual(
+            (LargeEnum.code999, [LargeEnum.code1, LargeEnum.code2]),
+            namespace.action(namespace),
+        )
+
     def test_argparse_option_can_be_injected(self):
         self.decorate(func_with_defaulted_int_arg, "action", n={"action": "count"})
 
@@ -270,6 +295,14 @@ class ArgparseActionTest(unittest.TestCase):  # pylint: disable=too-many-public-
         self.assertEqual("other", getattr(namespace, "kw_arg"))
         self.assertEqual("other", namespace.action(namespace))
 
+    def test_handle_underscore_in_keyword_only_arg(self):
+        self.decorate(func_with_underscore_in_keyword_only_arg, "action")
+
+        namespace = self.parse_args("action other")
+
+        self.assertEqual("other", getattr(namespace, "kw-arg"))
+        self.assertEqual("other", namespace.action(namespace))
+
     def test_handle_underscore_in_defaulted_arg(self):
         self.decorate(func_with_underscore_in_defaulted_arg, "action")
 
@@ -323,6 +356,340 @@ class ArgparseActionTest(unittest.TestCase):  # pylint: disable=too-many-public-
         self.assertEqual(["debug", "info"], namespace.option)
         self.assertEqual([Level.debug, Level.info], namespace.action(namespace))
 
+    def test_lazy_command_is_imported_when_selected(self):
+        self.action.add_lazy(f"{__name__}:func_with_arg", "alias")
+
+        namespace = self.parse_args("func-with-arg value")
+        self.assertEqual("value", namespace.action(namespace))
+
+        namespace = self.parse_args("alias value")
+        self.assertEqual("value", namespace.action(namespace))
+
+    def test_lazy_command_is_not_imported_until_selected(self):
+        self.action.add_lazy("not_existing_module:func", help="lazy help")
+        self.decorate(simple_func)
+
+        namespace = self.parse_args("simple-func")
+        self.assertEqual("simple", namespace.action(namespace))
+        self.assertIn("lazy help", self.parser.format_help())
+
+        with self.assertRaises(ModuleNotFoundError):
+            self.parse_args("func")
+
+    def test_lazy_command_reference_has_to_name_a_function(self):
+        with self.assertRaises(ValueError):
+            self.action.add_lazy("module_without_function")
+
+    def test_commands_are_registered_as_specs(self):
+        self.decorate(func_with_arg, "alias")
+        self.action.add_lazy(f"{__name__}:simple_func", help="lazy help")
+
+        commands = self.action.commands
+        self.assertEqual(["func-with-arg", "simple-func"], list(commands))
+        self.assertEqual(("alias",), commands["func-with-arg"].aliases)
+        self.assertIs(func_with_arg, commands["func-with-arg"].func)
+        self.assertEqual(f"{__name__}:simple_func", commands["simple-func"].reference)
+        self.assertEqual("lazy help", commands["simple-func"].help)
+
+    def test_command_parser_is_built_when_selected(self):
+        self.decorate(func_with_arg, "alias")
+        subparsers = self.action._parsers  # pylint: disable=protected-access
+
+        self.assertIsInstance(
+            dict.get(subparsers.choices, "alias"), argparse_action.CommandSpec
+        )
+
+        namespace = self.parse_args("alias value")
+        self.assertEqual("value", namespace.action(namespace))
+        self.assertIs(
+            dict.get(subparsers.choices, "alias"),
+            dict.get(subparsers.choices, "func-with-arg"),
+        )
+        self.assertIn("usage: ", subparsers.choices["alias"].format_usage())
+
+    def test_command_parsers_are_built_by_introspection(self):
+        self.decorate(func_with_arg, "alias")
+        self.decorate(simple_func)
+        subparsers = self.action._parsers  # pylint: disable=protected-access
+
+        self.assertIsInstance(subparsers.choices.get("alias"), argparse.ArgumentParser)
+        self.assertTrue(
+            all(
+                isinstance(parser, argparse.ArgumentParser)
+                for parser in subparsers.choices.values()
+            )
+        )
+        self.assertEqual(
+            ["func-with-arg", "alias", "simple-func"],
+            [name for name, _ in subparsers.choices.items()],
+        )
+
+    def test_command_parser_is_built_with_the_options_of_add_parser(self):
+        self.decorate(func_with_arg, "alias")
+        subparsers = self.action._parsers  # pylint: disable=protected-access
+        spec = self.action.commands["func-with-arg"]
+
+        self.assertEqual(spec.parser_options["prog"], subparsers.choices["alias"].prog)
+
+        spec.set_prog(prog="cli command", description="command description")
+        parser = subparsers.build(spec)
+
+        self.assertEqual("cli command", parser.prog)
+        self.assertEqual("command description", parser.description)
+
+    def test_definition_errors_are_raised_at_registration(self):
+        def func_with_help_conflict(h=1):
+            return h
+
+        with self.assertRaises(argparse.ArgumentError):
+            self.decorate(func_with_help_conflict)
+
+        with self.assertRaises(argparse.ArgumentError):
+            self.decorate(func_with_fan_out_conflict, fan_out="thread")
+
+        with self.assertRaises(ValueError):
+            self.decorate(func_with_arg, unknown={"help": "typo"})
+
+    def test_run_returns_the_exit_status(self):
+        self.decorate(func_arg_with_annotation, "action")
+        self.decorate(func_exiting_with_status, "exit")
+        self.decorate(simple_func)
+
+        self.assertEqual(0, self.action.run(["action", "42"]))
+        self.assertEqual(3, self.action.run(["exit", "3"]))
+        self.assertEqual(0, self.action.run(["simple-func"]))
+
+        with io.StringIO() as buf, contextlib.redirect_stderr(buf):
+            self.assertEqual(2, self.action.run(["unknown"]))
+
+    def test_batch_reports_exit_status_per_line(self):
+        self.decorate(func_arg_with_annotation, "action")
+        self.decorate(func_with_arg, "echo")
+        lines = io.StringIO(
+            "action 1\n"
+            "\n"
+            "# comment\n"
+            "echo 'quoted value'\n"
+            "action invalid\n"
+            "echo 'unbalanced\n"
+            "action 2\n"
+        )
+
+        with io.StringIO() as buf, contextlib.redirect_stderr(buf):
+            statuses = self.action.run_batch(lines)
+            self.assertIn("line 6: No closing quotation", buf.getvalue())
+
+        self.assertEqual([(1, 0), (4, 0), (5, 2), (6, 2), (7, 0)], statuses)
+
+    def test_batch_goes_on_after_exception(self):
+        self.decorate(func_raising_error, "fail")
+        self.decorate(simple_func)
+
+        with io.StringIO() as buf, contextlib.redirect_stderr(buf):
+            statuses = self.action.run_batch(["fail spam", "simple-func"])
+            self.assertIn("ValueError: spam", buf.getvalue())
+
+        self.assertEqual([(1, 1), (2, 0)], statuses)
+
+    def test_coroutine_function_is_run_by_action(self):
+        self.decorate(coroutine_with_arg, "action")
+        namespace = self.parse_args("action value")
+
+        self.assertEqual("value", namespace.action(namespace))
+
+    def test_actions_can_be_gathered_with_limit(self):
+        self.decorate(coroutine_with_arg, "action")
+        self.decorate(func_arg_with_annotation, "number")
+        namespaces = [self.parse_args(f"action value{i}") for i in range(10)]
+        namespaces.append(self.parse_args("number 42"))
+
+        counter = {"running": 0, "peak": 0}
+        token = _COUNTER.set(counter)
+
+        try:
+            results = asyncio.run(argparse_action.gather_actions(namespaces, limit=3))
+        finally:
+            _COUNTER.reset(token)
+
+        self.assertEqual([f"value{i}" for i in range(10)] + [42], results)
+        self.assertEqual(3, counter["peak"])
+
+    @unittest.skipIf(
+        sys.version_info < (3, 9), f"Unsupported feature on python {sys.version_info}"
+    )
+    def test_iterator_items_are_streamed_from_file(self):
+        self.decorate(func_with_iterator_arg, "action")
+
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as item_file:
+            item_file.write("1\n2\n\n3\n")
+            item_file.flush()
+
+            namespace = self.parse_args(f"action {item_file.name}")
+            items = namespace.action(namespace)
+
+            self.assertIs(items, iter(items))
+            self.assertEqual([1, 2, 3], list(items))
+
+    @unittest.skipIf(
+        sys.version_info < (3, 9), f"Unsupported feature on python {sys.version_info}"
+    )
+    def test_iterator_items_are_streamed_from_stdin_by_default(self):
+        self.decorate(func_with_defaulted_enum_iterator_arg, "action")
+        namespace = self.parse_args("action")
+        stdin = sys.stdin
+        sys.stdin = io.StringIO("debug\ninfo\n")
+
+        try:
+            levels = list(namespace.action(namespace))
+        finally:
+            sys.stdin = stdin
+
+        self.assertEqual([Level.debug, Level.info], levels)
+
+    def test_array_default_accepts_delimited_items_and_ranges(self):
+        self.decorate(func_with_array_defaults, "action")
+
+        namespace = self.parse_args("action --ids 1,5-7 --ids=-2--1 --ratios 0.5,1e-3")
+        ids, ratios = namespace.action(namespace)
+
+        self.assertEqual(array.array("q", [1, 5, 6, 7, -2, -1]), ids)
+        self.assertEqual(array.array("d", [0.5, 0.001]), ratios)
+
+        namespace = self.parse_args("action")
+        self.assertEqual(
+            (array.array("q"), array.array("d", [1.0])), namespace.action(namespace)
+        )
+
+        with io.StringIO() as buf, contextlib.redirect_stderr(buf):
+            with self.assertRaises(SystemExit):
+                self.parse_args("action --ids 1,x")
+
+            self.assertIn("invalid array value: '1,x'", buf.getvalue())
+
+    def test_range_default_accepts_range_token(self):
+        self.decorate(func_with_range_default, "action")
+
+        namespace = self.parse_args("action --ids 1-1000000")
+        self.assertEqual(range(1, 1000001), namespace.action(namespace))
+
+        namespace = self.parse_args("action --ids 3")
+        self.assertEqual(range(3, 4), namespace.action(namespace))
+
+        namespace = self.parse_args("action")
+        self.assertEqual(range(0), namespace.action(namespace))
+
+    def test_range_default_is_shown_as_range_token(self):
+        self.decorate(func_with_range_default, "empty")
+        self.decorate(func_with_negative_range_default, "negative")
+        subparsers = self.action._parsers  # pylint: disable=protected-access
+
+        self.assertIn("default: none", subparsers.choices["empty"].format_help())
+        self.assertIn("default: -3--1", subparsers.choices["negative"].format_help())
+
+    @unittest.skipIf(
+        sys.version_info < (3, 9), f"Unsupported feature on python {sys.version_info}"
+    )
+    def test_chained_commands_stream_results(self):
+        events = []
+
+        @self.action.add()
+        def produce(count: int):
+            for index in range(count):
+                events.append(f"produce {index}")
+                yield str(index)
+
+        @self.action.add()
+        def double(items: typing.Iterator[int] = "-"):
+            return (item * 2 for item in items)
+
+        @self.action.add()
+        def consume(items: typing.Iterator[int] = "-", status: int = 0):
+            for item in items:
+                events.append(f"consume {item}")
+
+            if status:
+                raise SystemExit(status)
+
+        status = self.action.run_chain(
+            "produce 2 :: double :: consume --status 3".split()
+        )
+
+        self.assertEqual(3, status)
+        self.assertEqual(["produce 0", "consume 0", "produce 1", "consume 2"], events)
+
+    @unittest.skipIf(
+        sys.version_info < (3, 9), f"Unsupported feature on python {sys.version_info}"
+    )
+    def test_last_chained_iterator_is_exhausted(self):
+        squares = []
+
+        @self.action.add()
+        def count(n: int):
+            return range(n)
+
+        @self.action.add()
+        def square(items: typing.Iterator[int] = "-"):
+            for item in items:
+                squares.append(item * item)
+                yield item * item
+
+        self.assertEqual(0, self.action.run_chain("count 3 :: square".split()))
+        self.assertEqual([0, 1, 4], squares)
+
+    def test_chain_is_parsed_before_run(self):
+        self.decorate(func_raising_error, "fail")
+
+        with io.StringIO() as buf, contextlib.redirect_stderr(buf):
+            self.assertEqual(2, self.action.run_chain(["fail", "x", "::", "unknown"]))
+
+    def test_registration_is_timed(self):
+        self.decorate(simple_func)
+        self.action.add_lazy(f"{__name__}:func_with_arg")
+        self.assertEqual(["register"], list(self.action.timings))
+
+        self.parse_args("func-with-arg value")
+        self.assertEqual(["register", "import"], list(self.action.timings))
+
+    def test_invocation_phases_are_timed(self):
+        parser = argparse.ArgumentParser()
+        action = argparse_action.Action(parser, timings=True)
+        action.add("action")(coroutine_with_arg)
+
+        with io.StringIO() as buf, contextlib.redirect_stderr(buf):
+            self.assertEqual(0, action.run(["--timings", "stderr", "action", "value"]))
+            report = buf.getvalue()
+
+        self.assertEqual(["register", "parse", "bind", "call"], list(action.timings))
+        self.assertTrue(all(seconds >= 0 for seconds in action.timings.values()))
+        self.assertRegex(report, r"^timings register=[\d.]+ms parse=[\d.]+ms ")
+
+        with self.assertLogs("argparse_action") as logs:
+            action.run(["--timings", "log", "action", "value"])
+
+        self.assertEqual(
+            ["register", "parse", "bind", "call"], list(logs.records[0].timings)
+        )
+
+    def test_timed_actions_can_be_gathered(self):
+        parser = argparse.ArgumentParser()
+        action = argparse_action.Action(parser, timings=True)
+        action.add("action")(func_with_arg)
+        action.add("coroutine")(coroutine_with_arg)
+
+        namespaces = [
+            parser.parse_args(["action", "spam"]),
+            parser.parse_args(["coroutine", "egg"]),
+        ]
+        results = asyncio.run(argparse_action.gather_actions(namespaces))
+
+        self.assertEqual(["spam", "egg"], results)
+
+        namespaces = [parser.parse_args(["coroutine", "ham"])]
+        results = asyncio.run(argparse_action.gather_actions(namespaces))
+
+        self.assertEqual(["ham"], results)
+        self.assertEqual(["register", "parse", "bind", "call"], list(action.timings))
+
 
 # pylint: disable=invalid-name
 
@@ -401,10 +768,17 @@ class Level(enum.Enum):
     error = enum.auto()
 
 
+LargeEnum = enum.Enum("LargeEnum", [f"code{index}" for index in range(1000)])
+
+
 def func_with_enum_arg_annotation(level: Level):
     return level
 
 
+def func_with_large_enum_arg(code: LargeEnum, others: typing.List[LargeEnum] = ()):
+    return code, others
+
+
 def func_with_defaulted_int_arg(n=0):
     return n
 
@@ -421,6 +795,10 @@ def func_with_underscore_in_kwargs(*, kw_arg="DEFAULT"):
     return kw_arg
 
 
+def func_with_underscore_in_keyword_only_arg(*, kw_arg):
+    return kw_arg
+
+
 def func_with_underscore_in_defaulted_arg(default_param="DEFAULT"):
     return default_param
 
@@ -433,20 +811,75 @@ def func_with_enum_annotated_vargs(*params: Level):
     return params
 
 
+_COUNTER = contextvars.ContextVar("counter", default=None)
+
+
+async def coroutine_with_arg(arg):
+    counter = _COUNTER.get()
+
+    if counter is not None:
+        counter["running"] += 1
+        counter["peak"] = max(counter["peak"], counter["running"])
+
+    await asyncio.sleep(0.01)
+
+    if counter is not None:
+        counter["running"] -= 1
+
+    return arg
+
+
+def func_with_fan_out_conflict(*items, jobs=1):
+    return items, jobs
+
+
+def func_exiting_with_status(status: int):
+    raise SystemExit(status)
+
+
+def func_raising_error(message):
+    raise ValueError(message)
+
+
+def func_with_iterator_arg(items: typing.Iterator[int]):
+    return items
+
+
+def func_with_array_defaults(
+    ids: typing.Sequence[int] = array.array("q"),
+    ratios: typing.Sequence[float] = array.array("d", [1.0]),
+):
+    return ids, ratios
+
+
+def func_with_range_default(ids=range(0)):
+    return ids
+
+
+def func_with_negative_range_default(ids=range(-3, 0)):
+    return ids
+
+
 def func_with_sequence_default(option=()):
     return option
 
 
 if sys.version_info >= (3, 9):
+
     def func_with_annotated_sequence_default(option: typing.Sequence[int] = ()):
         return sum(option)
 
-
-    def func_with_sequence_default_annotated_with_enum(option: typing.Sequence[Level] = ()):
+    def func_with_sequence_default_annotated_with_enum(
+        option: typing.Sequence[Level] = (),
+    ):
         return option
 
-
     def func_sequence_annotation_with_collections_abc(
         option: collections.abc.Sequence[Level] = (),
     ):
         return option
+
+    def func_with_defaulted_enum_iterator_arg(
+        levels: collections.abc.Iterator[Level] = "-",
+    ):
+        return levels
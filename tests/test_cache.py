@@ -0,0 +1,216 @@
+import unittest
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import typing
+
+import argparse_action
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        # pylint: disable-next=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.calls = []
+        self.parser = argparse.ArgumentParser()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def create_action(self, **policy):
+        calls = self.calls
+        action = argparse_action.Action(self.parser)
+        cache = argparse_action.CachePolicy(directory=self.tmp_dir.name, **policy)
+
+        @action.add(cache=cache)
+        def square(n: int, offset=0):
+            calls.append(n)
+            return n * n + int(offset)
+
+        return action
+
+    def run_command(self, command_line):
+        namespace = self.parser.parse_args(command_line.split())
+        return namespace.action(namespace)
+
+    def count_entries(self):
+        return sum(len(files) for _, _, files in os.walk(self.tmp_dir.name))
+
+    def test_result_is_keyed_by_the_bound_arguments(self):
+        self.create_action()
+
+        self.assertEqual(4, self.run_command("square 2"))
+        self.assertEqual(4, self.run_command("square 2"))
+        self.assertEqual(5, self.run_command("square 2 --offset 1"))
+        self.assertEqual(9, self.run_command("square 3"))
+
+        self.assertEqual([2, 2, 3], self.calls)
+
+    def test_expired_result_is_not_served(self):
+        self.create_action(ttl=0.05)
+
+        self.run_command("square 2")
+        time.sleep(0.1)
+        self.run_command("square 2")
+
+        self.assertEqual([2, 2], self.calls)
+
+    def test_least_recently_used_results_are_evicted(self):
+        self.create_action(max_entries=2)
+
+        for n in (1, 2, 1, 3, 1, 2):
+            self.run_command(f"square {n}")
+            time.sleep(0.01)
+
+        self.assertEqual([1, 2, 3, 2], self.calls)
+        self.assertEqual(2, self.count_entries())
+
+    def test_cache_can_be_bypassed_and_cleared(self):
+        self.create_action()
+
+        self.run_command("square 2")
+        self.run_command("square 3")
+        self.run_command("square 2 --no-cache")
+        self.run_command("square 2")
+        self.assertEqual([2, 3, 2], self.calls)
+
+        self.run_command("square 2 --clear-cache")
+        self.assertEqual([2, 3, 2, 2], self.calls)
+        self.assertEqual(1, self.count_entries())
+
+    def test_functions_of_the_same_name_do_not_share_results(self):
+        self.create_action()
+        self.assertEqual(4, self.run_command("square 2"))
+
+        def negative_square(n: int, offset=0):
+            return -n * n + int(offset)
+
+        negative_square.__name__ = "square"
+        negative_square.__qualname__ = "CacheTest.create_action.<locals>.square"
+        self.parser = argparse.ArgumentParser()
+        action = argparse_action.Action(self.parser)
+        cache = argparse_action.CachePolicy(directory=self.tmp_dir.name)
+        action.add(cache=cache)(negative_square)
+
+        self.assertEqual(-4, self.run_command("square 2"))
+
+    @unittest.skipIf(
+        sys.version_info < (3, 9), f"Unsupported feature on python {sys.version_info}"
+    )
+    def test_iterator_parameter_can_not_be_cached(self):
+        action = argparse_action.Action(argparse.ArgumentParser())
+        cache = argparse_action.CachePolicy(directory=self.tmp_dir.name)
+
+        with self.assertRaises(ValueError):
+            action.add(cache=cache)(sum_items)
+
+        with self.assertRaises(ValueError):
+            argparse_action.add_action(
+                argparse.ArgumentParser(), sum_items, cache=cache
+            )
+
+    def test_cached_actions_can_be_gathered(self):
+        self.create_action()
+        namespaces = [self.parser.parse_args(["square", str(n)]) for n in (2, 2, 3)]
+
+        results = asyncio.run(argparse_action.gather_actions(namespaces, limit=1))
+
+        self.assertEqual([4, 4, 9], results)
+        self.assertEqual([2, 3], self.calls)
+
+    def test_cached_coroutines_can_be_gathered(self):
+        calls = self.calls
+        action = argparse_action.Action(self.parser)
+        cache = argparse_action.CachePolicy(directory=self.tmp_dir.name)
+
+        @action.add(cache=cache)
+        async def cube(n: int):
+            calls.append(n)
+            return n * n * n
+
+        namespaces = [self.parser.parse_args(["cube", str(n)]) for n in (2, 2, 3)]
+
+        results = asyncio.run(argparse_action.gather_actions(namespaces, limit=1))
+
+        self.assertEqual([8, 8, 27], results)
+        self.assertEqual([2, 3], self.calls)
+
+
+class HelpCacheTest(unittest.TestCase):
+    def setUp(self):
+        # pylint: disable-next=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        CountingHelpFormatter.count = 0
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def create_parser(self, *funcs):
+        parser = argparse.ArgumentParser(formatter_class=CountingHelpFormatter)
+        action = argparse_action.Action(
+            parser,
+            help_cache=argparse_action.CachePolicy(directory=self.tmp_dir.name),
+        )
+
+        for func in funcs:
+            action.add()(func)
+
+        return parser
+
+    def render_help(self, *funcs):
+        parser = self.create_parser(*funcs)
+        count = CountingHelpFormatter.count
+        help_text = parser.format_help()
+
+        return help_text, CountingHelpFormatter.count - count
+
+    def test_help_is_rendered_once(self):
+        help_text, render_count = self.render_help(echo)
+
+        self.assertEqual(1, render_count)
+        self.assertIn("Print the word", help_text)
+        self.assertEqual((help_text, 0), self.render_help(echo))
+
+    def test_help_is_rendered_again_after_change(self):
+        self.render_help(echo)
+        help_text, render_count = self.render_help(echo, double)
+
+        self.assertEqual(1, render_count)
+        self.assertIn("double", help_text)
+
+    def test_command_help_is_cached(self):
+        parser = self.create_parser(echo)
+        CountingHelpFormatter.count = 0
+        # pylint: disable-next=protected-access
+        command_parser = parser._subparsers._group_actions[0].choices["echo"]
+        command_parser.formatter_class = CountingHelpFormatter
+
+        help_text = command_parser.format_help()
+
+        self.assertEqual(help_text, command_parser.format_help())
+        self.assertEqual(1, CountingHelpFormatter.count)
+        self.assertIn("--upper", help_text)
+
+
+class CountingHelpFormatter(argparse.HelpFormatter):
+    count = 0
+
+    def format_help(self):
+        CountingHelpFormatter.count += 1
+        return super().format_help()
+
+
+def echo(word, upper=False):
+    "Print the word"
+    print(word.upper() if upper else word)
+
+
+def double(n: int):
+    return 2 * n
+
+
+def sum_items(items: typing.Iterator[int]):
+    return sum(items)
@@ -0,0 +1,70 @@
+import unittest
+import argparse
+import enum
+import shutil
+import subprocess
+
+import argparse_action
+from argparse_action.completion import generate_completion
+
+
+class CompletionTest(unittest.TestCase):
+    def setUp(self):
+        self.parser = argparse.ArgumentParser(prog="my-cli")
+        self.action = argparse_action.Action(self.parser)
+        self.action.add("e")(echo)
+        self.action.add_lazy("test_completion:lazy_command")
+
+    def test_completion_is_deterministic(self):
+        self.assertEqual(
+            generate_completion(self.parser), generate_completion(self.parser)
+        )
+
+    def test_zsh_completion_holds_the_parser_tree(self):
+        script = generate_completion(self.parser, "zsh")
+
+        self.assertTrue(script.startswith("#compdef my-cli\n"))
+        self.assertIn(":e) cmd_path=echo ;;", script)
+        self.assertIn("echo:--level) compadd -- debug info; return ;;", script)
+        self.assertIn("lazy-command) compadd -- -h --help --count ;;", script)
+
+    def test_unknown_shell_is_rejected(self):
+        with self.assertRaises(ValueError):
+            generate_completion(self.parser, "fish")
+
+    @unittest.skipUnless(shutil.which("bash"), "bash is not installed")
+    def test_bash_completion(self):
+        self.assertEqual(["echo", "e"], self.complete("e"))
+        self.assertEqual(["--upper"], self.complete("e --u"))
+        self.assertEqual(["debug"], self.complete("echo --upper --level d"))
+        self.assertEqual(["--count"], self.complete("lazy-command --c"))
+
+    def complete(self, command_line):
+        words = ["my-cli"] + command_line.split()
+        script = generate_completion(self.parser) + (
+            f"COMP_WORDS=({' '.join(words)})\n"
+            f"COMP_CWORD={len(words) - 1}\n"
+            "_my_cli_complete\n"
+            'printf "%s\\n" "${COMPREPLY[@]}"\n'
+        )
+        result = subprocess.run(
+            ["bash", "-c", script], capture_output=True, check=True, text=True
+        )
+
+        return result.stdout.split()
+
+
+# pylint: disable=invalid-name,unused-argument
+
+
+class Level(enum.Enum):
+    debug = enum.auto()
+    info = enum.auto()
+
+
+def echo(word, upper=False, level: Level = Level.info):
+    return word.upper() if upper else word
+
+
+def lazy_command(count: int = 1):
+    return count
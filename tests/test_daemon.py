@@ -0,0 +1,119 @@
+import unittest
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+
+import argparse_action
+from argparse_action import daemon
+
+
+@unittest.skipUnless(
+    hasattr(socket, "send_fds") and hasattr(os, "fork"),
+    f"Unsupported feature on {sys.platform} python {sys.version_info}",
+)
+class DaemonTest(unittest.TestCase):
+    def setUp(self):
+        parser = argparse.ArgumentParser()
+        action = argparse_action.Action(parser)
+        action.add()(echo)
+        action.add()(cat)
+        action.add()(getenv)
+        action.add()(getcwd)
+
+        # pylint: disable-next=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.address = os.path.join(self.tmp_dir.name, "daemon.sock")
+        context = multiprocessing.get_context("fork")
+        self.server = context.Process(target=daemon.serve, args=(action, self.address))
+        self.server.start()
+
+        while not os.path.exists(self.address):
+            time.sleep(0.01)
+
+    def tearDown(self):
+        self.server.terminate()
+        self.server.join()
+        self.tmp_dir.cleanup()
+
+    def call(self, argv, stdin=""):
+        with tempfile.TemporaryFile("w+") as stdin_file, tempfile.TemporaryFile(
+            "w+"
+        ) as stdout_file, tempfile.TemporaryFile("w+") as stderr_file:
+            stdin_file.write(stdin)
+            stdin_file.seek(0)
+
+            status = daemon.call(
+                self.address,
+                argv,
+                stdin=stdin_file,
+                stdout=stdout_file,
+                stderr=stderr_file,
+            )
+
+            stdout_file.seek(0)
+            stderr_file.seek(0)
+
+            return status, stdout_file.read(), stderr_file.read()
+
+    def test_command_output_is_streamed_to_the_client(self):
+        self.assertEqual((0, "hello\n", ""), self.call(["echo", "hello"]))
+
+    def test_exit_status_is_returned(self):
+        self.assertEqual(
+            (3, "spam\n", ""), self.call(["echo", "spam", "--status", "3"])
+        )
+
+    def test_cli_error_is_reported(self):
+        status, stdout, stderr = self.call(["unknown"])
+
+        self.assertEqual(2, status)
+        self.assertEqual("", stdout)
+        self.assertIn("invalid choice", stderr)
+
+    def test_stdin_is_forwarded(self):
+        self.assertEqual((0, "egg\nspam\n", ""), self.call(["cat"], "egg\nspam\n"))
+
+    def test_environment_is_forwarded(self):
+        os.environ["ARGPARSE_ACTION_TEST"] = "ham"
+
+        try:
+            self.assertEqual(
+                (0, "ham\n", ""), self.call(["getenv", "ARGPARSE_ACTION_TEST"])
+            )
+        finally:
+            del os.environ["ARGPARSE_ACTION_TEST"]
+
+    def test_working_directory_is_forwarded(self):
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir.name)
+
+        try:
+            status, stdout, _ = self.call(["getcwd"])
+        finally:
+            os.chdir(cwd)
+
+        self.assertEqual(0, status)
+        self.assertEqual(os.path.realpath(self.tmp_dir.name), stdout.strip())
+
+
+def echo(word, status: int = 0):
+    print(word)
+
+    if status:
+        raise SystemExit(status)
+
+
+def cat():
+    sys.stdout.write(sys.stdin.read())
+
+
+def getenv(name):
+    print(os.environ[name])
+
+
+def getcwd():
+    print(os.path.realpath(os.getcwd()))
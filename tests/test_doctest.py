@@ -0,0 +1,15 @@
+import unittest
+import doctest
+
+import argparse_action.action
+import argparse_action.cache
+
+
+class DoctestTest(unittest.TestCase):
+    def test_action_module(self):
+        failures, _ = doctest.testmod(argparse_action.action)
+        self.assertEqual(0, failures)
+
+    def test_cache_module(self):
+        failures, _ = doctest.testmod(argparse_action.cache)
+        self.assertEqual(0, failures)
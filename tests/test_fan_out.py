@@ -0,0 +1,91 @@
+import unittest
+import argparse
+import contextlib
+import io
+
+import argparse_action
+
+
+class FanOutTest(unittest.TestCase):
+    def setUp(self):
+        self.parser = argparse.ArgumentParser()
+        self.action = argparse_action.Action(self.parser)
+
+    def run_command(self, command_line):
+        namespace = self.parser.parse_args(command_line.split())
+        return namespace.action(namespace)
+
+    def test_varg_can_be_fanned_out_over_threads(self):
+        self.action.add("action", fan_out="thread")(func_with_arg_and_varg)
+
+        self.assertEqual(
+            [["egg.spam"], ["egg.ham"], ["egg.bacon"]],
+            self.run_command("action egg. spam ham bacon"),
+        )
+        self.assertEqual(
+            [["egg.spam", "egg.ham"], ["egg.bacon"]],
+            self.run_command("action egg. spam ham bacon --chunk-size 2"),
+        )
+
+    def test_varg_can_be_fanned_out_over_processes(self):
+        self.action.add("action", fan_out="process")(func_varg_with_annotation)
+
+        self.assertEqual(
+            [3, 7, 5], self.run_command("action 1 2 3 4 5 --chunk-size 2 --jobs 2")
+        )
+
+    def test_fan_out_failures_are_aggregated(self):
+        self.action.add("action", fan_out="thread")(func_varg_raising_error)
+
+        with self.assertRaises(argparse_action.FanOutError) as context:
+            self.run_command("action spam ok egg")
+
+        self.assertEqual(
+            [["spam"], ["egg"]], [items for items, _ in context.exception.failures]
+        )
+
+    def test_only_varg_can_be_fanned_out(self):
+        with self.assertRaises(ValueError):
+            self.action.add("action", fan_out="thread")(func_with_arg)
+
+        with self.assertRaises(ValueError):
+            self.action.add("other", fan_out="unknown")(func_with_varg)
+
+        with self.assertRaises(ValueError):
+            self.action.add("coroutine", fan_out="thread")(coroutine_with_varg)
+
+    def test_fan_out_options_have_to_be_positive(self):
+        self.action.add("action", fan_out="thread")(func_with_arg_and_varg)
+
+        for option in ["--jobs", "--chunk-size"]:
+            with self.subTest(option=option):
+                with io.StringIO() as buf, contextlib.redirect_stderr(buf):
+                    with self.assertRaises(SystemExit):
+                        self.run_command(f"action egg. spam {option} 0")
+
+                    self.assertIn("invalid positive int value: '0'", buf.getvalue())
+
+
+def func_with_arg(arg):
+    return arg
+
+
+def func_with_varg(*args):
+    return args
+
+
+def func_varg_with_annotation(*args: int):
+    return sum(args)
+
+
+def func_with_arg_and_varg(arg, *args):
+    return [arg + s for s in args]
+
+
+def func_varg_raising_error(*messages):
+    if messages != ("ok",):
+        raise ValueError(*messages)
+
+
+async def coroutine_with_varg(*args):
+    return args
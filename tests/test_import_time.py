@@ -0,0 +1,64 @@
+import unittest
+import os
+import re
+import subprocess
+import sys
+
+# Budget of ``import argparse_action`` including the import of ``argparse``,
+# about twice the measured cost with compiled bytecode, the benchmarks track the
+# trend.
+IMPORT_TIME_BUDGET_US = int(os.environ.get("ARGPARSE_ACTION_IMPORT_BUDGET_US", "25000"))
+
+HEAVY_MODULES = (
+    "asyncio",
+    "concurrent.futures",
+    "inspect",
+    "logging",
+    "logging.handlers",
+    "queue",
+    "socket",
+    "threading",
+    "typing",
+)
+
+
+class ImportTimeTest(unittest.TestCase):
+    def test_heavy_modules_are_not_imported(self):
+        imported = _eval_python(
+            "import sys, argparse; imported = set(sys.modules);"
+            "import argparse_action;"
+            f"print(' '.join(m for m in {HEAVY_MODULES!r}"
+            " if m in sys.modules and m not in imported))"
+        ).stdout.split()
+
+        self.assertEqual([], imported)
+
+    def test_import_time_is_within_budget(self):
+        import_time = min(_measure_import_time() for _ in range(5))
+
+        self.assertLessEqual(import_time, IMPORT_TIME_BUDGET_US)
+
+    def test_logging_helpers_are_imported_on_demand(self):
+        imported = _eval_python(
+            "import sys, argparse_action;"
+            "argparse_action.add_log_arguments;"
+            "print('logging.handlers' in sys.modules)"
+        ).stdout
+
+        self.assertEqual("True\n", imported)
+
+
+def _measure_import_time():
+    stderr = _eval_python("import argparse_action", "-X", "importtime").stderr
+    match = re.search(r"\|\s+(\d+) \| argparse_action$", stderr, re.MULTILINE)
+
+    return int(match.group(1))
+
+
+def _eval_python(code, *options):
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
@@ -0,0 +1,445 @@
+import unittest
+import argparse
+import gzip
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import argparse_action
+
+
+class LoggingTest(unittest.TestCase):  # pylint: disable=too-many-public-methods
+    def setUp(self):
+        self.parser = argparse.ArgumentParser()
+        argparse_action.add_log_arguments(self.parser)
+        self.root_handlers = logging.getLogger().handlers[:]
+
+        # pylint: disable-next=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.tmp_dir.name, "test.log")
+
+    def tearDown(self):
+        close_root_handlers(self.root_handlers)
+        self.tmp_dir.cleanup()
+
+    def init_logging(self, command_line, default_handler=None):
+        namespace = self.parser.parse_args(command_line.split())
+        argparse_action.init_logging(namespace, default_handler=default_handler)
+
+    def read_log_file(self):
+        with open(self.log_file, encoding="utf-8") as log_file:
+            return log_file.read()
+
+    def test_async_logging_writes_records_on_close(self):
+        self.init_logging(
+            f"--log-async --log-format %(message)s --log-file {self.log_file}"
+        )
+
+        for index in range(100):
+            logging.info("record %d", index)
+
+        close_root_handlers(self.root_handlers)
+
+        self.assertEqual(
+            "".join(f"record {index}\n" for index in range(100)), self.read_log_file()
+        )
+
+    def test_async_logging_respects_log_level(self):
+        self.init_logging(
+            f"--log-async --log-format %(message)s --log-file {self.log_file}"
+            " --log-level error"
+        )
+
+        logging.info("info")
+        logging.error("error")
+        close_root_handlers(self.root_handlers)
+
+        self.assertEqual("error\n", self.read_log_file())
+
+    def test_drop_new_overflow_policy(self):
+        handler = BlockingHandler()
+        self.init_logging(
+            "--log-async --log-queue-size 1 --log-overflow drop-new", handler
+        )
+
+        fill_blocked_queue(handler)
+        close_root_handlers(self.root_handlers)
+        messages = handler.messages
+
+        self.assertEqual(["first", "second"], messages[:2])
+        self.assertEqual(
+            "3 log records were dropped by --log-overflow=drop-new", messages[2]
+        )
+
+    def test_drop_oldest_overflow_policy(self):
+        handler = BlockingHandler()
+        self.init_logging(
+            "--log-async --log-queue-size 1 --log-overflow drop-oldest", handler
+        )
+
+        fill_blocked_queue(handler)
+        close_root_handlers(self.root_handlers)
+        messages = handler.messages
+
+        self.assertEqual(["first", "fifth"], messages[:2])
+        self.assertEqual(
+            "3 log records were dropped by --log-overflow=drop-oldest", messages[2]
+        )
+
+    def test_file_records_are_buffered(self):
+        self.init_logging(
+            f"--log-file {self.log_file} --log-format %(message)s --log-buffer-size 3"
+        )
+
+        logging.info("first")
+        logging.info("second")
+        self.assertEqual("", self.read_log_file())
+
+        logging.info("third")
+        self.assertEqual("first\nsecond\nthird\n", self.read_log_file())
+
+        logging.info("fourth")
+        logging.error("error")
+        self.assertEqual("first\nsecond\nthird\nfourth\nerror\n", self.read_log_file())
+
+    def test_file_records_are_written_in_a_batch(self):
+        self.init_logging(
+            f"--log-file {self.log_file} --log-format %(message)s --log-buffer-size 3"
+        )
+        handler = logging.getLogger().handlers[-1]
+        stream = handler.target.stream
+
+        with mock.patch.object(stream, "flush", wraps=stream.flush) as flush:
+            for message in ("first", "second", "third"):
+                logging.info(message)
+
+        self.assertEqual(1, flush.call_count)
+        self.assertEqual("first\nsecond\nthird\n", self.read_log_file())
+
+        close_root_handlers(self.root_handlers)
+        self.assertTrue(stream.closed)
+
+    def test_file_records_of_a_batch_are_rotated(self):
+        self.init_logging(
+            f"--log-file {self.log_file} --log-format %(message)s"
+            " --log-buffer-size 3 --log-rotate-size 20 --log-backup-count 2"
+        )
+
+        for message in ("first record", "second record", "third record"):
+            logging.info(message)
+
+        self.assertEqual("third record\n", self.read_log_file())
+
+        with open(f"{self.log_file}.1", encoding="utf-8") as rotated_file:
+            self.assertEqual("second record\n", rotated_file.read())
+
+    def test_file_buffer_is_flushed_periodically(self):
+        self.init_logging(
+            f"--log-file {self.log_file} --log-format %(message)s"
+            " --log-buffer-size 100 --log-flush-interval 0.01"
+        )
+
+        logging.info("first")
+
+        deadline = time.monotonic() + 5
+        while not self.read_log_file() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual("first\n", self.read_log_file())
+
+    def test_rotated_files_are_compressed(self):
+        self.init_logging(
+            f"--log-file {self.log_file} --log-format %(message)s"
+            " --log-rotate-size 20 --log-backup-count 2 --log-compress"
+        )
+
+        for message in ("first record", "second record", "third record"):
+            logging.info(message)
+
+        close_root_handlers(self.root_handlers)
+
+        self.assertEqual("third record\n", self.read_log_file())
+        self.assertEqual(
+            ["test.log", "test.log.1.gz", "test.log.2.gz"],
+            sorted(os.listdir(self.tmp_dir.name)),
+        )
+
+        with gzip.open(f"{self.log_file}.1.gz", "rt") as rotated_file:
+            self.assertEqual("second record\n", rotated_file.read())
+
+    def test_json_log_format(self):
+        self.init_logging(
+            f"--log-file {self.log_file} --log-format json"
+            " --log-fields name,levelname,lineno,message"
+        )
+
+        logging.getLogger("test").warning("%s message", "json", extra={"spam": 42})
+        close_root_handlers(self.root_handlers)
+
+        record = json.loads(self.read_log_file())
+        self.assertEqual(
+            {
+                "name": "test",
+                "levelname": "WARNING",
+                "lineno": record["lineno"],
+                "message": "json message",
+                "spam": 42,
+            },
+            record,
+        )
+        self.assertIsInstance(record["lineno"], int)
+
+    def test_json_log_format_writes_lines(self):
+        self.init_logging(f"--log-file {self.log_file} --log-format json")
+
+        logging.info("first\nline")
+
+        try:
+            raise ValueError("error")
+        except ValueError:
+            logging.exception("second")
+
+        close_root_handlers(self.root_handlers)
+
+        first, second = map(json.loads, self.read_log_file().splitlines())
+        self.assertEqual("first\nline", first["message"])
+        self.assertEqual(
+            ["asctime", "name", "levelname", "message"], list(first.keys())
+        )
+        self.assertIn("ValueError: error", second["exc_text"])
+
+    def test_records_below_sample_level_are_sampled(self):
+        self.init_logging(
+            f"--log-file {self.log_file} --log-format %(message)s --log-level debug"
+            " --log-sample-rate 0 --log-sample-level info"
+        )
+
+        logging.debug("debug")
+        logging.info("info")
+        close_root_handlers(self.root_handlers)
+
+        self.assertEqual("info\n", self.read_log_file())
+
+    def test_records_are_rate_limited_per_logger(self):
+        self.init_logging(
+            f"--log-file {self.log_file} --log-format %(name)s:%(message)s"
+            " --log-rate-limit 0.001 --log-rate-burst 2"
+        )
+
+        for index in range(4):
+            logging.getLogger("spam").info("%d", index)
+            logging.getLogger("egg").info("%d", index)
+
+        close_root_handlers(self.root_handlers)
+
+        self.assertEqual("spam:0\negg:0\nspam:1\negg:1\n", self.read_log_file())
+
+    def test_records_are_rate_limited_per_template(self):
+        self.init_logging(
+            f"--log-file {self.log_file} --log-format %(message)s"
+            " --log-rate-limit 0.001 --log-rate-burst 1 --log-rate-key template"
+        )
+
+        for index in range(3):
+            logging.info("spam %d", index)
+            logging.info("egg %d", index)
+
+        close_root_handlers(self.root_handlers)
+
+        self.assertEqual("spam 0\negg 0\n", self.read_log_file())
+
+    def test_formatted_messages_of_a_call_share_the_template_limit(self):
+        self.init_logging(
+            f"--log-file {self.log_file} --log-format %(message)s"
+            " --log-rate-limit 0.001 --log-rate-burst 1 --log-rate-key template"
+        )
+
+        for index in range(3):
+            # pylint: disable-next=logging-fstring-interpolation
+            logging.info(f"item {index}")
+
+        close_root_handlers(self.root_handlers)
+
+        self.assertEqual("item 0\n", self.read_log_file())
+
+    def test_rate_limit_buckets_are_bounded(self):
+        self.init_logging(
+            "--log-none --log-rate-limit 1000 --log-rate-burst 1 --log-rate-key logger"
+        )
+        (throttle,) = logging.getLogger().handlers[-1].filters
+        buckets = throttle._buckets  # pylint: disable=protected-access
+
+        for index in range(3 * buckets.MAX_BUCKETS):
+            logging.getLogger(f"logger{index}").info("record")
+
+        self.assertLessEqual(len(buckets), buckets.MAX_BUCKETS)
+
+    def test_suppressed_records_are_summarized(self):
+        self.init_logging(
+            f"--log-file {self.log_file} --log-format %(message)s"
+            " --log-rate-limit 0.001 --log-rate-burst 1 --log-summary-interval 0"
+        )
+
+        logging.info("first")
+        logging.info("second")
+        logging.info("third")
+        close_root_handlers(self.root_handlers)
+
+        self.assertEqual("first\n1 log records were suppressed\n", self.read_log_file())
+
+    def test_syslog_records_are_batched_over_tcp(self):
+        with SyslogServer() as server:
+            self.init_logging(
+                f"--log-syslog user --log-syslog-address {server.address}"
+                " --log-syslog-protocol tcp --log-format %(message)s"
+                " --log-buffer-size 3"
+            )
+
+            logging.info("first")
+            logging.info("second")
+            self.assertEqual([], server.chunks)
+
+            logging.warning("third")
+            close_root_handlers(self.root_handlers)
+
+        self.assertEqual([b"9 <14>first10 <14>second9 <12>third"], server.connections)
+
+    def test_syslog_tcp_connection_is_reopened(self):
+        with SyslogServer(drop_first=True) as server:
+            self.init_logging(
+                f"--log-syslog user --log-syslog-address {server.address}"
+                " --log-syslog-protocol tcp --log-format %(message)s"
+            )
+
+            logging.info("first")
+            server.dropped.wait(5)
+            logging.info("second")
+            close_root_handlers(self.root_handlers)
+
+        self.assertEqual([b"9 <14>first", b"10 <14>second"], server.connections)
+
+    def test_syslog_stream_unix_socket_is_detected(self):
+        path = os.path.join(self.tmp_dir.name, "log.sock")
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(path)
+            server.listen()
+            server.settimeout(5)
+            self.init_logging(
+                f"--log-syslog user --log-syslog-address {path}"
+                " --log-format %(message)s"
+            )
+
+            logging.info("hello")
+            connection, _ = server.accept()
+
+            with connection:
+                connection.settimeout(5)
+                self.assertEqual(b"<14>hello\x00", connection.recv(1024))
+
+    def test_syslog_records_are_sent_over_udp(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as server:
+            server.bind(("127.0.0.1", 0))
+            server.settimeout(5)
+            self.init_logging(
+                "--log-syslog local0 --log-format %(message)s"
+                f" --log-syslog-address 127.0.0.1:{server.getsockname()[1]}"
+                " --log-buffer-size 2"
+            )
+
+            logging.info("first")
+            logging.error("second")
+
+            self.assertEqual(b"<134>first\x00", server.recv(1024))
+            self.assertEqual(b"<131>second\x00", server.recv(1024))
+
+
+class SyslogServer(threading.Thread):
+    """
+    TCP server which collects the received data per connection. The first
+    connection is closed after its first chunk if ``drop_first`` is set.
+    """
+
+    def __init__(self, drop_first=False):
+        super().__init__(daemon=True)
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.listener.settimeout(0.1)
+        self.address = f"127.0.0.1:{self.listener.getsockname()[1]}"
+        self.drop_first = drop_first
+        self.dropped = threading.Event()
+        self.stopped = threading.Event()
+        self.chunks = []
+        self.connections = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.join()
+        self.listener.close()
+
+    def run(self):
+        while True:
+            try:
+                connection, _ = self.listener.accept()
+            except socket.timeout:
+                if self.stopped.is_set():
+                    return
+
+                continue
+
+            with connection:
+                self.receive(connection)
+
+            if self.drop_first:
+                self.dropped.set()
+
+    def receive(self, connection):
+        data = bytearray()
+        self.connections.append(data)
+
+        while chunk := connection.recv(4096):
+            self.chunks.append(chunk)
+            data.extend(chunk)
+
+            if self.drop_first and not self.dropped.is_set():
+                return
+
+
+class BlockingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.emitting = threading.Event()
+        self.unblock = threading.Event()
+        self.messages = []
+
+    def emit(self, record):
+        self.emitting.set()
+        self.unblock.wait()
+        self.messages.append(record.getMessage())
+
+
+def fill_blocked_queue(handler):
+    logging.warning("first")
+    handler.emitting.wait()
+
+    for message in ("second", "third", "fourth", "fifth"):
+        logging.warning(message)
+
+    handler.unblock.set()
+
+
+def close_root_handlers(keep):
+    logger = logging.getLogger()
+
+    for handler in logger.handlers[:]:
+        if handler not in keep:
+            logger.removeHandler(handler)
+            handler.close()
@@ -0,0 +1,101 @@
+import unittest
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import pstats
+import tempfile
+import time
+
+import argparse_action
+
+
+class ProfilingTest(unittest.TestCase):
+    def setUp(self):
+        self.parser = argparse.ArgumentParser()
+        self.action = argparse_action.Action(self.parser, profile=True)
+        self.action.add("sl")(sleep)
+
+        # pylint: disable-next=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_action(self, command_line):
+        namespace = self.parser.parse_args(
+            f"--profile-dir {self.tmp_dir.name} {command_line}".split()
+        )
+        stderr = io.StringIO()
+
+        with contextlib.redirect_stderr(stderr):
+            result = namespace.action(namespace)
+
+        return result, stderr.getvalue()
+
+    def test_action_is_not_wrapped_without_profile(self):
+        namespace = self.parser.parse_args(["sleep"])
+
+        self.assertIs(sleep, namespace.action.func)
+        self.assertEqual([], os.listdir(self.tmp_dir.name))
+
+    def test_cprofile_stats_are_written(self):
+        result, stderr = self.run_action("--profile cprofile sleep --seconds 0.01")
+
+        self.assertEqual(0.01, result)
+        self.assertEqual("", stderr)
+
+        stats = pstats.Stats(os.path.join(self.tmp_dir.name, "sleep.prof"))
+        self.assertIn("sleep", {function for _, _, function in stats.stats})
+
+    def test_profiled_action_keeps_the_function(self):
+        namespace = self.parser.parse_args(["--profile", "cprofile", "sleep"])
+
+        self.assertIs(sleep, namespace.action.func)
+        self.assertEqual(([0.0], {}), namespace.action.bind(namespace))
+
+    def test_profiled_coroutines_can_be_gathered(self):
+        self.action.add()(async_sleep)
+        namespace = self.parser.parse_args(
+            f"--profile-dir {self.tmp_dir.name} --profile cprofile async-sleep".split()
+        )
+
+        results = asyncio.run(argparse_action.gather_actions([namespace]))
+
+        self.assertEqual([0.0], results)
+        self.assertTrue(
+            os.path.exists(os.path.join(self.tmp_dir.name, "async-sleep.prof"))
+        )
+
+    def test_cprofile_top_functions_are_printed(self):
+        _, stderr = self.run_action("--profile cprofile --profile-top 3 sl")
+
+        self.assertIn("cumulative", stderr)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir.name, "sl.prof")))
+
+    def test_sampled_stacks_are_written(self):
+        _, stderr = self.run_action(
+            "--profile sample --profile-interval 0.001 --profile-top 3"
+            " sleep --seconds 0.1"
+        )
+
+        with open(
+            os.path.join(self.tmp_dir.name, "sleep.folded"), encoding="utf-8"
+        ) as stack_file:
+            stacks = stack_file.read().splitlines()
+
+        self.assertTrue(stacks)
+        self.assertTrue(all(" (" in stack.split(";")[-1] for stack in stacks))
+        self.assertIn(" sleep (", stderr)
+        self.assertRegex(stderr, r"^\d+ samples\n")
+
+
+def sleep(seconds: float = 0.0):
+    time.sleep(seconds)
+    return seconds
+
+
+async def async_sleep(seconds: float = 0.0):
+    await asyncio.sleep(seconds)
+    return seconds
@@ -0,0 +1,141 @@
+import unittest
+import argparse
+import contextlib
+import dataclasses
+import enum
+import io
+import sys
+import typing
+
+import argparse_action
+
+
+class RecordTest(unittest.TestCase):
+    def setUp(self):
+        self.parser = argparse.ArgumentParser()
+        self.action = argparse_action.Action(self.parser)
+
+    def parse_args(self, command_line):
+        return self.parser.parse_args(command_line.split())
+
+    def test_dataclass_fields_are_prefixed_options(self):
+        self.action.add("action")(func_with_dataclass_arg)
+
+        namespace = self.parse_args(
+            "action --connection-host example.org --connection-secure"
+            " --connection-level error"
+        )
+        self.assertEqual(
+            Connection("example.org", 80, True, Level.error),
+            namespace.action(namespace),
+        )
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                self.parse_args("action --connection-port 8080")
+
+    @unittest.skipIf(
+        sys.version_info < (3, 9), f"Unsupported feature on python {sys.version_info}"
+    )
+    def test_dataclass_sequence_fields_are_append_options(self):
+        @dataclasses.dataclass
+        class Tagged:
+            tags: typing.List[str] = dataclasses.field(default_factory=list)
+
+        def func_with_tagged_arg(tagged: Tagged):
+            return tagged
+
+        self.action.add("action")(func_with_tagged_arg)
+
+        namespace = self.parse_args("action --tagged-tags a --tagged-tags b")
+        self.assertEqual(Tagged(["a", "b"]), namespace.action(namespace))
+
+    def test_record_defaults_are_taken_from_the_default_instance(self):
+        self.action.add("action")(func_with_dataclass_default)
+        self.action.add("other")(func_with_named_tuple_default)
+
+        namespace = self.parse_args("action --connection-port 8080")
+        self.assertEqual(
+            Connection("localhost", 8080, False, Level.debug),
+            namespace.action(namespace),
+        )
+
+        namespace = self.parse_args("other --point-y 3")
+        self.assertEqual(Point(2, 3), namespace.action(namespace))
+
+        def func_with_invalid_record_default(point: Point = None):
+            return point
+
+        with self.assertRaises(ValueError):
+            self.action.add("invalid")(func_with_invalid_record_default)
+
+    def test_named_tuple_fields_are_prefixed_options(self):
+        self.action.add("action")(func_with_named_tuple_arg)
+
+        namespace = self.parse_args("action 3 --point-x 1")
+        self.assertEqual((3, Point(1, 0)), namespace.action(namespace))
+
+    @unittest.skipIf(
+        sys.version_info < (3, 10), f"Unsupported feature on python {sys.version_info}"
+    )
+    def test_slotted_dataclass_is_constructed(self):
+        @dataclasses.dataclass(slots=True)  # pylint: disable=unexpected-keyword-arg
+        class Slotted:
+            name: str
+            count: int = 1
+
+        def func_with_slotted_arg(slotted: Slotted):
+            return slotted
+
+        self.action.add("action")(func_with_slotted_arg)
+
+        namespace = self.parse_args("action --slotted-name spam --slotted-count 2")
+        result = namespace.action(namespace)
+        self.assertEqual(Slotted("spam", 2), result)
+        self.assertFalse(hasattr(result, "__dict__"))
+
+    def test_options_of_the_record_fields_are_checked(self):
+        with self.assertRaises(ValueError):
+            self.action.add(connection={"help": "record"})(func_with_dataclass_arg)
+
+        self.action.add(connection_host={"help": "field"})(func_with_dataclass_arg)
+
+
+# pylint: disable=invalid-name
+
+
+class Level(enum.Enum):
+    debug = enum.auto()
+    info = enum.auto()
+    error = enum.auto()
+
+
+@dataclasses.dataclass
+class Connection:
+    host: str
+    port: int = 80
+    secure: bool = False
+    level: Level = Level.info
+
+
+def func_with_dataclass_arg(connection: Connection):
+    return connection
+
+
+class Point(typing.NamedTuple):
+    x: int
+    y: int = 0
+
+
+def func_with_named_tuple_arg(scale: int, point: Point):
+    return scale, point
+
+
+def func_with_dataclass_default(
+    connection: Connection = Connection("localhost", level=Level.debug)
+):
+    return connection
+
+
+def func_with_named_tuple_default(point: Point = Point(2)):
+    return point
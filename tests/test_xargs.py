@@ -0,0 +1,95 @@
+import unittest
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+
+import argparse_action
+
+
+class XargsTest(unittest.TestCase):
+    def setUp(self):
+        self.parser = argparse.ArgumentParser()
+        self.action = argparse_action.Action(self.parser, xargs=True)
+        self.action.add()(echo)
+        self.action.add()(square)
+
+        # pylint: disable-next=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.args_file = os.path.join(self.tmp_dir.name, "args.txt")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_xargs(self, lines, command_line):
+        with open(self.args_file, "w", encoding="utf-8") as args_file:
+            args_file.write(lines)
+
+        with io.StringIO() as stdout, io.StringIO() as stderr:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                status = self.action.run(
+                    ["--args-from", self.args_file] + command_line.split()
+                )
+
+            return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_command_is_run_per_line_in_order(self):
+        lines = "".join(f"word{index}\n" for index in range(20))
+
+        status, stdout, stderr = self.run_xargs(lines, "--jobs 4 echo --upper")
+
+        self.assertEqual(0, status)
+        self.assertEqual(lines.upper(), stdout)
+        self.assertEqual("", stderr)
+
+    def test_unordered_output_holds_every_line(self):
+        lines = "spam\n# comment\n\negg\n'quoted ham'\n"
+
+        status, stdout, _ = self.run_xargs(lines, "--unordered echo")
+
+        self.assertEqual(0, status)
+        self.assertEqual(["egg", "quoted ham", "spam"], sorted(stdout.splitlines()))
+
+    def test_failures_are_summarized(self):
+        status, stdout, stderr = self.run_xargs(
+            "spam\nspam --status 3\nspam --unknown\n", "echo"
+        )
+
+        self.assertEqual(1, status)
+        self.assertEqual("spam\nspam\n", stdout)
+        self.assertIn("unrecognized arguments: --unknown", stderr)
+        self.assertIn(
+            "2 of 3 invocations failed: line 2 (status 3), line 3 (status 2)", stderr
+        )
+
+    def test_results_are_not_exit_statuses(self):
+        status, stdout, stderr = self.run_xargs("2\n3\n", "square")
+
+        self.assertEqual(0, status)
+        self.assertEqual("", stderr)
+        self.assertEqual("", stdout)
+
+    def test_badly_quoted_line_is_a_failure(self):
+        status, stdout, stderr = self.run_xargs("spam\n'egg\nham\n", "echo")
+
+        self.assertEqual(1, status)
+        self.assertEqual("spam\nham\n", stdout)
+        self.assertIn("line 2: No closing quotation", stderr)
+        self.assertIn("1 of 3 invocations failed: line 2 (status 2)", stderr)
+
+    def test_command_is_run_once_without_args_from(self):
+        with io.StringIO() as stdout, contextlib.redirect_stdout(stdout):
+            self.assertEqual(0, self.action.run(["echo", "spam"]))
+            self.assertEqual("spam\n", stdout.getvalue())
+
+
+def echo(word, upper=False, status: int = 0):
+    print(word.upper() if upper else word)
+
+    if status:
+        raise SystemExit(status)
+
+
+def square(number: int):
+    return number * number